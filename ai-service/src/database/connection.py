@@ -5,10 +5,17 @@ Provides async connection pooling for the AI service to interact with
 the agfin_ai_bot_sessions and agfin_ai_bot_messages tables.
 """
 
+import functools
 import os
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import asyncpg
+import orjson
+
+
+def _encode_json(value: Any) -> str:
+    """Encode a Python value to JSON text for a json/jsonb parameter."""
+    return orjson.dumps(value).decode()
 
 
 class DatabaseClient:
@@ -38,11 +45,55 @@ class DatabaseClient:
         if self.pool is None:
             self.pool = await asyncpg.create_pool(
                 self.database_url,
-                min_size=2,
-                max_size=10,
-                command_timeout=60
+                # Pool sizing is env-tunable: an undersized pool serializes
+                # concurrent tool calls on acquire(), an oversized one
+                # wastes Postgres backends, and the right ceiling depends
+                # on the deployment
+                min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                command_timeout=60,
+                # Generous prepared-statement cache with no expiry: the
+                # service runs a fixed set of queries, so plans prepared on
+                # a connection stay reusable for its lifetime
+                statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "1024")),
+                max_cached_statement_lifetime=0,
+                # Tag the service's sessions so its load shows up
+                # separately in pg_stat_activity / pg_stat_statements;
+                # also what a read-replica pool would key routing on if
+                # the deployment ever gains a replica
+                server_settings={"application_name": "agfin-ai-service"},
+                init=self._init_connection
             )
 
+    @staticmethod
+    async def _init_connection(conn: asyncpg.Connection):
+        """
+        Per-connection setup: register type codecs for the service.
+
+        json/jsonb columns decode into Python objects, so queries can
+        aggregate server-side (json_agg, row_to_json) and hand back
+        ready-to-use dicts/lists instead of JSON strings. uuid columns
+        decode straight to str, which is the form every response uses.
+        """
+        for type_name in ("json", "jsonb"):
+            await conn.set_type_codec(
+                type_name,
+                encoder=_encode_json,
+                decoder=orjson.loads,
+                schema="pg_catalog"
+            )
+
+        # Hand UUID columns back as plain strings so response building
+        # skips a str(uuid_obj) call per field; UUID and str parameters
+        # both encode through str() on the way in
+        await conn.set_type_codec(
+            "uuid",
+            encoder=str,
+            decoder=str,
+            schema="pg_catalog",
+            format="text"
+        )
+
     async def close(self):
         """Close connection pool."""
         if self.pool:
@@ -232,24 +283,20 @@ class DatabaseClient:
         if not self.pool:
             await self.connect()
 
-        # Get the timestamp of the reference message
-        get_timestamp_query = """
-            SELECT created_at FROM agfin_ai_bot_messages
-            WHERE id = $1 AND session_id = $2
-        """
-
-        timestamp = await self.pool.fetchval(get_timestamp_query, message_id, session_id)
-        if not timestamp:
-            return 0
-
-        # Delete all messages created after this timestamp
+        # Resolve the reference message's timestamp and delete in one round
+        # trip; if the reference message doesn't exist the subquery yields
+        # NULL, the comparison is never true, and nothing is deleted
         delete_query = """
             DELETE FROM agfin_ai_bot_messages
-            WHERE session_id = $1 AND created_at > $2
+            WHERE session_id = $1
+                AND created_at > (
+                    SELECT created_at FROM agfin_ai_bot_messages
+                    WHERE id = $2 AND session_id = $1
+                )
             RETURNING id
         """
 
-        deleted = await self.pool.fetch(delete_query, session_id, timestamp)
+        deleted = await self.pool.fetch(delete_query, session_id, message_id)
         return len(deleted)
 
 
@@ -277,3 +324,27 @@ async def close_db_client():
     if _client:
         await _client.close()
         _client = None
+
+
+def with_db_conn(fn):
+    """
+    Run an async function on a single pooled connection.
+
+    Acquires one connection from the shared pool, injects it as the `conn`
+    keyword argument, and releases it when the wrapped function returns.
+    Functions that issue several queries per call would otherwise pay a pool
+    acquire/release cycle (and contend on the pool's internal lock) for each
+    individual query.
+
+    Args:
+        fn: Async function accepting a `conn` keyword argument
+
+    Returns:
+        Wrapped async function that manages connection acquisition
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        db_client = await get_db_client()
+        async with db_client.pool.acquire() as conn:
+            return await fn(*args, conn=conn, **kwargs)
+    return wrapper
@@ -0,0 +1,46 @@
+"""
+Session context passed to AI agent tools.
+
+The tool registry converts the session dictionary it receives into a
+SessionContext exactly once per execution, so every tool reads fields
+through fixed attribute offsets instead of repeated dictionary lookups
+with .get() defaults.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class SessionContext(NamedTuple):
+    """
+    Immutable per-execution session context for tool handlers.
+
+    Attributes:
+        user_id: UUID of the authenticated user, if any
+        application_id: UUID of the application linked to the session, if any
+        session_id: UUID of the chat session, if any
+    """
+
+    user_id: Optional[str] = None
+    application_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, context: Dict[str, Any]) -> "SessionContext":
+        """
+        Build a SessionContext from a raw session dictionary.
+
+        Unknown keys are ignored so callers can pass richer session
+        payloads without breaking tool dispatch.
+
+        Args:
+            context: Session dictionary with optional user_id,
+                application_id and session_id entries
+
+        Returns:
+            SessionContext with the recognized fields populated
+        """
+        return cls(
+            user_id=context.get("user_id"),
+            application_id=context.get("application_id"),
+            session_id=context.get("session_id")
+        )
@@ -9,9 +9,10 @@ Follows Anthropic's Tool Use guidelines for clear descriptions and parameter han
 
 from typing import Optional, Dict, Any
 import re
-from datetime import datetime
 import asyncpg
-from src.database.connection import get_db_client
+from src.database.connection import DatabaseClient, get_db_client
+from src.utils.app_cache import invalidate_application
+from src.tools.context import SessionContext
 
 
 # Tool definition for Anthropic Claude API
@@ -20,8 +21,8 @@ TOOL_DEFINITION = {
     "description": """Create a new agricultural finance certification application.
 
 This tool initiates a new certification application for a farmer or agricultural business.
-It creates the application record in the system and links it to the current user or
-creates a placeholder for the specified farmer.
+It creates the application record in the system, owned by the analyst in the current
+session, with the farmer's contact information attached.
 
 Use this when the user:
 - Wants to "start a new application"
@@ -33,8 +34,8 @@ The tool validates all inputs and returns the new application ID that can be use
 in subsequent conversations to track and update the application.
 
 Required information:
-- User context (user_id from session) OR farmer contact information
-- Certification type is optional and defaults to 'standard'
+- Analyst context (user_id from session - the analyst must be logged in)
+- farmer_name and farmer_email for the farmer the application is for
 
 The created application starts in 'draft' status and can be updated with documents
 and module data through other tools.""",
@@ -43,30 +44,53 @@ and module data through other tools.""",
         "properties": {
             "farmer_name": {
                 "type": "string",
-                "description": "Full name of the farmer or agricultural business owner. Optional if creating for current logged-in user. Example: 'John Smith' or 'Smith Family Farms LLC'"
+                "description": "Full name of the farmer or agricultural business owner. Required. Example: 'John Smith' or 'Smith Family Farms LLC'"
             },
             "farmer_email": {
                 "type": "string",
-                "description": "Email address for the farmer. Must be valid email format. Optional if creating for current user. Example: 'john.smith@example.com'"
+                "description": "Email address for the farmer. Must be valid email format. Required. Example: 'john.smith@example.com'"
             },
             "farmer_phone": {
                 "type": "string",
                 "description": "Phone number for the farmer. Optional. Can be any format (will be stored as provided). Example: '+1-555-123-4567' or '555-123-4567'"
-            },
-            "certification_type": {
-                "type": "string",
-                "description": "Type of certification being applied for. Optional, defaults to 'standard'. Valid values: 'standard', 'organic', 'sustainable', 'gmp' (Good Manufacturing Practice)."
-            },
-            "notes": {
-                "type": "string",
-                "description": "Optional notes about the application. Can include initial context, special requirements, or other relevant information."
             }
         },
-        "required": []  # All fields optional - will use session context if available
+        "required": ["farmer_name", "farmer_email"]
     }
 }
 
 
+# Hoisted to module scope so asyncpg's per-connection statement cache
+# reuses the prepared plan across invocations.
+_INSERT_APPLICATION_SQL = """
+    INSERT INTO applications (
+        analyst_id,
+        farmer_name,
+        farmer_email,
+        farmer_phone,
+        status
+    )
+    VALUES ($1, $2, $3, $4, 'draft')
+    RETURNING id, status, created_at, updated_at
+"""
+
+
+# Resolved database client, cached at module scope after the first call so
+# the hot path is a single load-and-check instead of re-entering the
+# connection module's lookup on every invocation.
+_db_client: Optional[DatabaseClient] = None
+
+
+async def _db() -> DatabaseClient:
+    """Return the shared database client, resolving it on first use."""
+    global _db_client
+    client = _db_client
+    if client is not None:
+        return client
+    _db_client = await get_db_client()
+    return _db_client
+
+
 def validate_email(email: str) -> bool:
     """
     Validate email format.
@@ -85,127 +109,69 @@ async def create_application(
     farmer_name: Optional[str] = None,
     farmer_email: Optional[str] = None,
     farmer_phone: Optional[str] = None,
-    certification_type: str = "standard",
-    notes: Optional[str] = None,
-    session_context: Optional[Dict[str, Any]] = None
+    session_context: Optional[SessionContext] = None
 ) -> Dict[str, Any]:
     """
     Create a new certification application in the database.
 
     Args:
-        farmer_name: Full name of the farmer (optional if using session user_id)
-        farmer_email: Email address (optional if using session user_id)
-        farmer_phone: Phone number (optional)
-        certification_type: Type of certification (default: 'standard')
-        notes: Additional notes about the application (optional)
-        session_context: Current conversation session with user_id (optional)
+        farmer_name: Full name of the farmer (required)
+        farmer_email: Email address of the farmer (required)
+        farmer_phone: Phone number of the farmer (optional)
+        session_context: Current conversation session with the analyst's user_id
 
     Returns:
         Dictionary containing:
         - application_id: UUID of the created application
         - status: Initial status ('draft')
-        - certification_type: Type of certification
+        - farmer_name: Name the application was created for
         - created_at: Timestamp of creation
         - message: Success message
         OR
         - error: Error code
         - message: Error description
     """
-    # Validate certification type
-    valid_cert_types = ["standard", "organic", "sustainable", "gmp"]
-    if certification_type not in valid_cert_types:
+    # The farmer contact columns are NOT NULL in the schema, so both are
+    # required regardless of session state
+    if not farmer_name:
         return {
-            "error": "invalid_certification_type",
-            "message": f"Certification type must be one of: {', '.join(valid_cert_types)}. Got: {certification_type}"
+            "error": "missing_required_fields",
+            "message": "farmer_name is required to create an application."
         }
 
-    # Determine user_id (from session or need to create/find user)
-    user_id = session_context.get("user_id") if session_context else None
-
-    # If no user_id from session, we need farmer contact info to create/find user
-    if not user_id:
-        if not farmer_email:
-            return {
-                "error": "missing_required_fields",
-                "message": "Either user must be logged in (user_id in session) or farmer_email must be provided to create application."
-            }
-
-        # Validate email format
-        if not validate_email(farmer_email):
-            return {
-                "error": "invalid_email",
-                "message": f"Invalid email format: {farmer_email}. Please provide a valid email address."
-            }
-
-        if not farmer_name:
-            return {
-                "error": "missing_required_fields",
-                "message": "farmer_name is required when creating application without logged-in user."
-            }
+    if not farmer_email:
+        return {
+            "error": "missing_required_fields",
+            "message": "farmer_email is required to create an application."
+        }
 
-    # Validate email if provided (even with user_id, might be updating contact info)
-    if farmer_email and not validate_email(farmer_email):
+    if not validate_email(farmer_email):
         return {
             "error": "invalid_email",
             "message": f"Invalid email format: {farmer_email}. Please provide a valid email address."
         }
 
+    # The application is owned by the analyst in the current session
+    user_id = session_context.user_id if session_context else None
+    if not user_id:
+        return {
+            "error": "authentication_required",
+            "message": "An application must be created by a logged-in analyst (no user_id in session)."
+        }
+
+    # The connection is only acquired now that validation has passed: a
+    # rejected call never touches the pool.
     try:
-        db_client = await get_db_client()
-
-        # If no user_id, try to find or create user based on email
-        if not user_id:
-            # Check if user exists with this email
-            existing_user = await db_client.pool.fetchrow(
-                "SELECT id FROM auth.users WHERE email = $1",
-                farmer_email
-            )
-
-            if existing_user:
-                user_id = str(existing_user["id"])
-            else:
-                # Create new user (simplified - in production would use Supabase auth)
-                # Note: This assumes a users table exists or uses auth.users
-                # For now, we'll just generate a UUID and assume user management is handled elsewhere
-                return {
-                    "error": "user_not_found",
-                    "message": f"No user found with email {farmer_email}. User must be created first through the authentication system."
-                }
-
-        # Create the application
-        insert_query = """
-            INSERT INTO applications (
-                user_id,
-                status,
-                certification_type,
-                notes
-            )
-            VALUES ($1, $2, $3, $4)
-            RETURNING id, status, certification_type, created_at, updated_at
-        """
+        db_client = await _db()
 
         application = await db_client.pool.fetchrow(
-            insert_query,
+            _INSERT_APPLICATION_SQL,
             user_id,
-            "draft",  # Initial status
-            certification_type,
-            notes
+            farmer_name,
+            farmer_email,
+            farmer_phone
         )
 
-        return {
-            "application_id": str(application["id"]),
-            "status": application["status"],
-            "certification_type": application["certification_type"],
-            "created_at": application["created_at"].isoformat(),
-            "updated_at": application["updated_at"].isoformat(),
-            "message": f"Successfully created {certification_type} certification application. Application ID: {application['id']}"
-        }
-
-    except asyncpg.UniqueViolationError as e:
-        return {
-            "error": "duplicate_application",
-            "message": f"User already has an active application. Please complete or cancel the existing application first."
-        }
     except asyncpg.PostgresError as e:
         return {
             "error": "database_error",
@@ -217,6 +183,18 @@ async def create_application(
             "message": f"Unexpected error: {str(e)}"
         }
 
+    # Drop any cached query_application results for this application
+    invalidate_application(str(application["id"]))
+
+    return {
+        "application_id": str(application["id"]),
+        "status": application["status"],
+        "farmer_name": farmer_name,
+        "created_at": application["created_at"].isoformat(),
+        "updated_at": application["updated_at"].isoformat(),
+        "message": f"Successfully created certification application for {farmer_name}. Application ID: {application['id']}"
+    }
+
 
 def get_tool_definition() -> Dict[str, Any]:
     """
@@ -9,8 +9,11 @@ Follows Anthropic's Tool Use guidelines for clear descriptions and parameter han
 
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from uuid import UUID
 import asyncpg
 from src.database.connection import get_db_client
+from src.utils.app_cache import get_cached_application, cache_application
+from src.tools.context import SessionContext
 
 
 # Tool definition for Anthropic Claude API
@@ -19,7 +22,7 @@ TOOL_DEFINITION = {
     "description": """Get detailed information about a certification application.
 
 This tool retrieves comprehensive application data including:
-- Current application status (draft, in_progress, under_review, approved, rejected)
+- Current application status (draft, awaiting_documents, awaiting_audit, certified, locked)
 - List of uploaded documents with their processing status
 - Module-specific data entries (financial records, compliance info, etc.)
 - Overall completion percentage based on required modules
@@ -39,6 +42,10 @@ The tool uses the application_id from the current conversation context if not pr
             "application_id": {
                 "type": "string",
                 "description": "UUID of the application to query. If not provided, uses the application_id from the current session context. Format: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx"
+            },
+            "documents_limit": {
+                "type": "integer",
+                "description": "Maximum number of documents to include in the response, newest first. Optional, defaults to 20. The total document count is always returned as documents_total."
             }
         },
         "required": []  # application_id is optional - uses context if not provided
@@ -46,22 +53,105 @@ The tool uses the application_id from the current conversation context if not pr
 }
 
 
+# Modules required for a complete application, keyed by module_number
+# as stored in module_data, with display names for the completion summary
+REQUIRED_MODULES = {
+    1: "financial",
+    2: "compliance",
+    3: "operations",
+    4: "sustainability",
+    5: "risk"
+}
+
+
+# Combined query for query_application. Hoisted to module scope so every
+# call reuses the identical SQL string: asyncpg's per-connection statement
+# cache is keyed on the query text, so the statement is parsed and planned
+# once per connection instead of on every invocation.
+_QUERY_APPLICATION_SQL = """
+    WITH app AS (
+        SELECT id, analyst_id, farmer_name, farmer_email, farmer_phone,
+               status, created_at, updated_at
+        FROM applications
+        WHERE id = $1
+          AND ($2::uuid IS NULL OR analyst_id = $2)
+    ),
+    docs AS (
+        SELECT COALESCE(json_agg(doc), '[]'::json) AS documents
+        FROM (
+            SELECT json_build_object(
+                'id', id::text,
+                'document_type', document_type,
+                'storage_path', storage_path,
+                'extraction_status', extraction_status,
+                'has_extracted_data', COALESCE(metadata, '{}'::jsonb) <> '{}'::jsonb,
+                'uploaded_at', created_at
+            ) AS doc
+            FROM documents
+            WHERE application_id = $1
+              AND EXISTS (SELECT 1 FROM app)
+            ORDER BY created_at DESC
+            LIMIT $3
+        ) recent
+    ),
+    doc_total AS (
+        SELECT count(*) AS documents_total
+        FROM documents
+        WHERE application_id = $1
+          AND EXISTS (SELECT 1 FROM app)
+    ),
+    mods AS (
+        SELECT COALESCE(json_agg(json_build_object(
+            'module_number', module_number,
+            'field_count', field_count,
+            'fields', fields
+        ) ORDER BY module_number), '[]'::json) AS modules
+        FROM (
+            SELECT
+                module_number,
+                count(*) AS field_count,
+                json_agg(json_build_object(
+                    'id', id::text,
+                    'field_id', field_id,
+                    'value', value,
+                    'source', source,
+                    'confidence_score', confidence_score::float8,
+                    'created_at', created_at
+                ) ORDER BY field_id) AS fields
+            FROM module_data
+            WHERE application_id = $1
+              AND EXISTS (SELECT 1 FROM app)
+            GROUP BY module_number
+        ) grouped
+    )
+    SELECT
+        (SELECT row_to_json(app) FROM app) AS app,
+        (SELECT documents FROM docs) AS documents,
+        (SELECT documents_total FROM doc_total) AS documents_total,
+        (SELECT modules FROM mods) AS modules
+"""
+
+
 async def query_application(
     application_id: Optional[str] = None,
-    session_context: Optional[Dict[str, Any]] = None
+    documents_limit: int = 20,
+    session_context: Optional[SessionContext] = None
 ) -> Dict[str, Any]:
     """
     Query detailed application information from the database.
 
     Args:
         application_id: UUID of the application to query (optional)
+        documents_limit: Maximum number of documents to return, newest
+            first (default: 20)
         session_context: Current conversation session with user_id and application_id (optional)
 
     Returns:
         Dictionary containing:
-        - application: Basic application info (id, status, created_at, updated_at)
-        - applicant: User information (id, email, name if available)
+        - application: Basic application info (id, analyst_id, status, created_at, updated_at)
+        - applicant: Farmer contact information (name, email, phone)
         - documents: List of uploaded documents with processing status
+        - documents_total: Total document count (may exceed len(documents))
         - modules: List of module data entries with completion status
         - completion: Completion percentage and required vs completed modules
         - error: Error message if something went wrong
@@ -73,7 +163,7 @@ async def query_application(
     # Determine which application to query BEFORE connecting to database
     target_application_id = application_id
     if not target_application_id and session_context:
-        target_application_id = session_context.get("application_id")
+        target_application_id = session_context.application_id
 
     if not target_application_id:
         return {
@@ -81,140 +171,95 @@ async def query_application(
             "message": "No application_id provided and no application linked to current session. Please provide an application_id or link an application to this conversation."
         }
 
-    # Now connect to database
-    db_client = await get_db_client()
+    if documents_limit < 1:
+        return {
+            "error": "invalid_documents_limit",
+            "message": f"documents_limit must be a positive integer. Got: {documents_limit}"
+        }
+
+    # Parse the UUID once up front: malformed ids fail here with a clear
+    # error instead of surfacing as a database error, the driver is handed
+    # an already-parsed UUID object, and the cache key is canonicalized
+    try:
+        app_uuid = UUID(target_application_id)
+    except (ValueError, AttributeError, TypeError):
+        return {
+            "error": "invalid_application_id",
+            "message": f"'{target_application_id}' is not a valid application UUID."
+        }
+    target_application_id = str(app_uuid)
 
     # Get user_id for authorization check
-    user_id = session_context.get("user_id") if session_context else None
+    user_id = session_context.user_id if session_context else None
+
+    # Serve repeated status queries from the in-process cache; entries are
+    # invalidated by the tools that mutate application state. The limit is
+    # part of the key so differently paginated results never mix.
+    cache_variant = (user_id, documents_limit)
+    cached = get_cached_application(target_application_id, cache_variant)
+    if cached is not None:
+        return cached
+
+    # Now connect to database
+    db_client = await get_db_client()
 
     try:
-        # Query application with applicant info
-        app_query = """
-            SELECT
-                a.id,
-                a.user_id,
-                a.status,
-                a.certification_type,
-                a.notes,
-                a.created_at,
-                a.updated_at
-            FROM applications a
-            WHERE a.id = $1
-        """
-        app_row = await db_client.pool.fetchrow(app_query, target_application_id)
+        # Authorization happens in the WHERE clause: rows the user cannot
+        # access are filtered server-side, so no unauthorized data crosses
+        # the wire and Python never branches on ownership
+        row = await db_client.pool.fetchrow(
+            _QUERY_APPLICATION_SQL,
+            app_uuid,
+            user_id,
+            documents_limit
+        )
 
+        app_row = row["app"] if row else None
         if not app_row:
             return {
                 "error": "application_not_found",
-                "message": f"Application with id {target_application_id} not found."
+                "message": f"Application with id {target_application_id} not found or you do not have permission to access it."
             }
 
-        # Authorization check - user can only access their own applications
-        if user_id and str(app_row["user_id"]) != user_id:
-            return {
-                "error": "unauthorized",
-                "message": "You do not have permission to access this application."
-            }
+        documents = row["documents"]
 
-        # Get documents for this application
-        docs_query = """
-            SELECT
-                id,
-                file_name,
-                file_size,
-                mime_type,
-                storage_path,
-                ocr_status,
-                extraction_metadata,
-                created_at
-            FROM documents
-            WHERE application_id = $1
-            ORDER BY created_at DESC
-        """
-        doc_rows = await db_client.pool.fetch(docs_query, target_application_id)
-
-        documents = [
-            {
-                "id": str(row["id"]),
-                "file_name": row["file_name"],
-                "file_size": row["file_size"],
-                "mime_type": row["mime_type"],
-                "ocr_status": row["ocr_status"],
-                "has_extracted_data": bool(row["extraction_metadata"]),
-                "uploaded_at": row["created_at"].isoformat()
-            }
-            for row in doc_rows
-        ]
+        # Modules arrive already grouped by module_number from the SQL
+        # aggregate; attach the display name for each known module
+        modules = row["modules"]
+        for module in modules:
+            module["module_name"] = REQUIRED_MODULES.get(module["module_number"])
 
-        # Get module data entries
-        modules_query = """
-            SELECT
-                id,
-                module_name,
-                field_name,
-                field_value,
-                data_source,
-                confidence_score,
-                created_at
-            FROM module_data
-            WHERE application_id = $1
-            ORDER BY module_name, field_name
-        """
-        module_rows = await db_client.pool.fetch(modules_query, target_application_id)
-
-        # Group by module name
-        modules_dict: Dict[str, List[Dict[str, Any]]] = {}
-        for row in module_rows:
-            module_name = row["module_name"]
-            if module_name not in modules_dict:
-                modules_dict[module_name] = []
-
-            modules_dict[module_name].append({
-                "id": str(row["id"]),
-                "field_name": row["field_name"],
-                "field_value": row["field_value"],
-                "data_source": row["data_source"],
-                "confidence_score": float(row["confidence_score"]) if row["confidence_score"] else None,
-                "created_at": row["created_at"].isoformat()
-            })
-
-        modules = [
-            {
-                "module_name": module_name,
-                "field_count": len(fields),
-                "fields": fields
-            }
-            for module_name, fields in modules_dict.items()
-        ]
+        # Calculate completion percentage with set intersection against the
+        # required module numbers
+        present_modules = REQUIRED_MODULES.keys() & {m["module_number"] for m in modules}
+        completion_pct = (len(present_modules) * 100) // len(REQUIRED_MODULES)
 
-        # Calculate completion percentage
-        # For now, assume 5 required modules: financial, compliance, operations, sustainability, risk
-        required_modules = ["financial", "compliance", "operations", "sustainability", "risk"]
-        completed_modules = [m for m in required_modules if m in modules_dict]
-        completion_pct = int((len(completed_modules) / len(required_modules)) * 100)
+        # Reuse the dict decoded from row_to_json instead of rebuilding it
+        # key by key; the farmer contact fields move into the applicant
+        # sub-object while the managing analyst stays on the application
+        applicant = {
+            "farmer_name": app_row.pop("farmer_name"),
+            "farmer_email": app_row.pop("farmer_email"),
+            "farmer_phone": app_row.pop("farmer_phone")
+        }
 
-        return {
-            "application": {
-                "id": str(app_row["id"]),
-                "status": app_row["status"],
-                "certification_type": app_row["certification_type"],
-                "notes": app_row["notes"],
-                "created_at": app_row["created_at"].isoformat(),
-                "updated_at": app_row["updated_at"].isoformat()
-            },
-            "applicant": {
-                "user_id": str(app_row["user_id"])
-            },
+        result = {
+            "application": app_row,
+            "applicant": applicant,
             "documents": documents,
+            "documents_total": row["documents_total"],
             "modules": modules,
             "completion": {
                 "percentage": completion_pct,
-                "required_modules": required_modules,
-                "completed_modules": completed_modules,
-                "missing_modules": [m for m in required_modules if m not in modules_dict]
+                "required_modules": list(REQUIRED_MODULES.values()),
+                "completed_modules": [name for num, name in REQUIRED_MODULES.items() if num in present_modules],
+                "missing_modules": [name for num, name in REQUIRED_MODULES.items() if num not in present_modules]
             }
         }
 
+        cache_application(target_application_id, cache_variant, result)
+        return result
+
     except asyncpg.PostgresError as e:
         return {
             "error": "database_error",
@@ -11,10 +11,12 @@ This module provides:
 - Comprehensive logging for debugging and audit
 """
 
-from typing import Dict, Any, Callable, Optional, List
+from typing import Dict, Any, Callable, Optional, List, Tuple
+import inspect
 import logging
 import time
-from datetime import datetime
+
+from .context import SessionContext
 
 # Import all tools
 from .query_application import query_application, get_tool_definition as get_query_application_definition
@@ -41,6 +43,19 @@ class ToolRegistry:
     def __init__(self):
         """Initialize the tool registry."""
         self._tools: Dict[str, Dict[str, Any]] = {}
+        # Rebuilt on each registration so the accessors below are plain
+        # attribute reads; the definition list is shipped on every Claude
+        # API call, so avoid recomputing it per call
+        self._definitions_cache: Tuple[Dict[str, Any], ...] = ()
+        self._names_cache: Tuple[str, ...] = ()
+        self.tool_count: int = 0
+        # Dispatch tables: one name->index lookup per execution, then flat
+        # tuple indexing for the handler and its precomputed metadata
+        self._name_to_id: Dict[str, int] = {}
+        self._dispatch: Tuple[Callable, ...] = ()
+        self._allowed_params: Tuple[frozenset, ...] = ()
+        self._required_params: Tuple[frozenset, ...] = ()
+        self._accepts_session_context: Tuple[bool, ...] = ()
         self._register_all_tools()
 
     def _register_all_tools(self):
@@ -68,7 +83,7 @@ class ToolRegistry:
         for tool_name, handler, definition_getter in tools_to_register:
             self.register_tool(tool_name, handler, definition_getter())
 
-        logger.info(f"Tool registry initialized with {len(self._tools)} tools")
+        logger.info("Tool registry initialized with %s tools", len(self._tools))
 
     def register_tool(
         self,
@@ -85,7 +100,7 @@ class ToolRegistry:
             definition: Anthropic tool definition dictionary
         """
         if name in self._tools:
-            logger.warning(f"Tool '{name}' already registered, overwriting")
+            logger.warning("Tool '%s' already registered, overwriting", name)
 
         # Validate definition has required fields
         if "name" not in definition or "input_schema" not in definition:
@@ -94,21 +109,56 @@ class ToolRegistry:
         if definition["name"] != name:
             raise ValueError(f"Tool name mismatch: registry name '{name}' vs definition name '{definition['name']}'")
 
+        input_schema = definition["input_schema"]
         self._tools[name] = {
             "handler": handler,
-            "definition": definition
+            "definition": definition,
+            # Precomputed dispatch metadata: execute_tool validates inputs
+            # against the schema's declared keys up front instead of relying
+            # on a TypeError from keyword-argument binding
+            "allowed_params": frozenset(input_schema.get("properties", {})),
+            "required_params": frozenset(input_schema.get("required", ())),
+            "accepts_session_context": (
+                "session_context" in inspect.signature(handler).parameters
+            )
         }
 
-        logger.debug(f"Registered tool: {name}")
-
-    def get_tool_definitions(self) -> List[Dict[str, Any]]:
+        # Rebuild the registration-time caches. Registration only happens at
+        # startup, so paying the rebuild here keeps every later lookup flat
+        self._definitions_cache = tuple(
+            tool["definition"] for tool in self._tools.values()
+        )
+        self._names_cache = tuple(self._tools)
+        self.tool_count = len(self._tools)
+        self._name_to_id = {
+            name: index for index, name in enumerate(self._tools)
+        }
+        self._dispatch = tuple(
+            tool["handler"] for tool in self._tools.values()
+        )
+        self._allowed_params = tuple(
+            tool["allowed_params"] for tool in self._tools.values()
+        )
+        self._required_params = tuple(
+            tool["required_params"] for tool in self._tools.values()
+        )
+        self._accepts_session_context = tuple(
+            tool["accepts_session_context"] for tool in self._tools.values()
+        )
+
+        logger.debug("Registered tool: %s", name)
+
+    def get_tool_definitions(self) -> Tuple[Dict[str, Any], ...]:
         """
         Get all tool definitions for Claude API.
 
+        The result is precomputed at registration since it is requested on
+        every Claude API call.
+
         Returns:
-            List of tool definition dictionaries for Anthropic API
+            Tuple of tool definition dictionaries for Anthropic API
         """
-        return [tool["definition"] for tool in self._tools.values()]
+        return self._definitions_cache
 
     def get_tool_definition(self, tool_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -147,17 +197,28 @@ class ToolRegistry:
             - execution_time: Time taken in seconds
             - tool_name: Name of executed tool
         """
-        start_time = time.time()
-
-        # Log tool execution start
-        logger.info(f"Executing tool: {tool_name}", extra={
-            "tool_name": tool_name,
-            "tool_input": tool_input,
-            "session_context": session_context
-        })
+        start_ns = time.perf_counter_ns()
+
+        # Convert the raw session dict once at the boundary; tools then read
+        # context fields as NamedTuple attributes instead of repeated .get()
+        # dictionary lookups
+        if isinstance(session_context, dict):
+            session_context = SessionContext.from_dict(session_context)
+
+        # Log tool execution start. The isEnabledFor guard skips building the
+        # extra dict entirely when INFO logging is disabled, and the %s style
+        # defers message formatting to the logging framework.
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing tool: %s", tool_name, extra={
+                "tool_name": tool_name,
+                "tool_input": tool_input,
+                "session_context": session_context
+            })
 
-        # Check if tool exists
-        if tool_name not in self._tools:
+        # Resolve the tool through the dispatch table: one dict lookup for
+        # the index, then flat tuple indexing for handler and metadata
+        tool_id = self._name_to_id.get(tool_name)
+        if tool_id is None:
             error_result = {
                 "success": False,
                 "error": {
@@ -165,42 +226,72 @@ class ToolRegistry:
                     "message": f"Tool '{tool_name}' not found in registry",
                     "available_tools": list(self._tools.keys())
                 },
-                "execution_time": time.time() - start_time,
+                "execution_time": (time.perf_counter_ns() - start_ns) / 1e9,
                 "tool_name": tool_name
             }
-            logger.error(f"Tool not found: {tool_name}")
+            logger.error("Tool not found: %s", tool_name)
             return error_result
 
-        # Get tool handler
-        tool_handler = self._tools[tool_name]["handler"]
+        tool_handler = self._dispatch[tool_id]
+
+        # Validate input keys against the tool's declared schema before
+        # dispatching, so invalid input never reaches argument binding
+        input_keys = tool_input.keys()
+        missing_params = self._required_params[tool_id] - input_keys
+        unexpected_params = input_keys - self._allowed_params[tool_id]
+        if missing_params or unexpected_params:
+            problems = []
+            if missing_params:
+                problems.append(f"missing required parameters: {sorted(missing_params)}")
+            if unexpected_params:
+                problems.append(f"unexpected parameters: {sorted(unexpected_params)}")
+            error_result = {
+                "success": False,
+                "error": {
+                    "type": "invalid_input",
+                    "message": f"Invalid input parameters for tool '{tool_name}': {'; '.join(problems)}",
+                    "details": "; ".join(problems)
+                },
+                "execution_time": (time.perf_counter_ns() - start_ns) / 1e9,
+                "tool_name": tool_name
+            }
+            logger.error("Invalid input for tool %s: %s", tool_name, "; ".join(problems), extra={
+                "tool_name": tool_name,
+                "tool_input": tool_input
+            })
+            return error_result
 
         try:
-            # Execute tool with session context
-            if session_context:
+            # Execute tool with session context when the handler accepts it
+            if session_context and self._accepts_session_context[tool_id]:
                 result = await tool_handler(**tool_input, session_context=session_context)
             else:
                 result = await tool_handler(**tool_input)
 
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
 
-            # Format successful result
+            # Format successful result. Tool results are plain dicts by
+            # contract: they are serialized directly (orjson here, the
+            # HTTP client's encoder at the API boundary), so intermediate
+            # result objects would only add a conversion back to dict.
             formatted_result = {
                 "success": "error" not in result,
                 "result": result,
                 "execution_time": execution_time,
-                "tool_name": tool_name,
-                "timestamp": datetime.utcnow().isoformat()
+                "tool_name": tool_name
             }
 
-            # Log success or error
+            # Log success or error, guarding so the extra dicts are only
+            # built when the corresponding log level is enabled
             if formatted_result["success"]:
-                logger.info(f"Tool executed successfully: {tool_name}", extra={
-                    "tool_name": tool_name,
-                    "execution_time": execution_time,
-                    "result_keys": list(result.keys()) if isinstance(result, dict) else None
-                })
-            else:
-                logger.warning(f"Tool returned error: {tool_name}", extra={
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Tool executed successfully: %s", tool_name, extra={
+                        "tool_name": tool_name,
+                        "execution_time": execution_time,
+                        "result_keys": list(result.keys()) if isinstance(result, dict) else None
+                    })
+            elif logger.isEnabledFor(logging.WARNING):
+                logger.warning("Tool returned error: %s", tool_name, extra={
                     "tool_name": tool_name,
                     "execution_time": execution_time,
                     "error": result.get("error"),
@@ -209,30 +300,9 @@ class ToolRegistry:
 
             return formatted_result
 
-        except TypeError as e:
-            # Invalid input parameters
-            execution_time = time.time() - start_time
-            error_result = {
-                "success": False,
-                "error": {
-                    "type": "invalid_input",
-                    "message": f"Invalid input parameters for tool '{tool_name}': {str(e)}",
-                    "details": str(e)
-                },
-                "execution_time": execution_time,
-                "tool_name": tool_name,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            logger.error(f"Invalid input for tool {tool_name}: {e}", extra={
-                "tool_name": tool_name,
-                "error": str(e),
-                "tool_input": tool_input
-            })
-            return error_result
-
         except Exception as e:
             # Unexpected error during execution
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
             error_result = {
                 "success": False,
                 "error": {
@@ -241,24 +311,25 @@ class ToolRegistry:
                     "details": str(e)
                 },
                 "execution_time": execution_time,
-                "tool_name": tool_name,
-                "timestamp": datetime.utcnow().isoformat()
+                "tool_name": tool_name
             }
-            logger.exception(f"Error executing tool {tool_name}", extra={
+            logger.exception("Error executing tool %s", tool_name, extra={
                 "tool_name": tool_name,
                 "error": str(e),
                 "tool_input": tool_input
             })
             return error_result
 
-    def list_tools(self) -> List[str]:
+    def list_tools(self) -> Tuple[str, ...]:
         """
-        Get list of all registered tool names.
+        Get all registered tool names.
+
+        The result is precomputed at registration.
 
         Returns:
-            List of tool names
+            Tuple of tool names
         """
-        return list(self._tools.keys())
+        return self._names_cache
 
     def get_tool_count(self) -> int:
         """
@@ -267,11 +338,13 @@ class ToolRegistry:
         Returns:
             Number of registered tools
         """
-        return len(self._tools)
+        return self.tool_count
 
 
-# Global registry instance
-_registry: Optional[ToolRegistry] = None
+# Global registry instance, built eagerly at import time. Registration is
+# cheap and import happens once at startup, so callers on the hot path get
+# a plain attribute read instead of a None check per call.
+_REGISTRY = ToolRegistry()
 
 
 def get_tool_registry() -> ToolRegistry:
@@ -281,22 +354,18 @@ def get_tool_registry() -> ToolRegistry:
     Returns:
         ToolRegistry instance
     """
-    global _registry
-    if _registry is None:
-        _registry = ToolRegistry()
-    return _registry
+    return _REGISTRY
 
 
 # Convenience functions for direct access
-def get_all_tool_definitions() -> List[Dict[str, Any]]:
+def get_all_tool_definitions() -> Tuple[Dict[str, Any], ...]:
     """
     Get all tool definitions for Claude API.
 
     Returns:
-        List of tool definition dictionaries
+        Tuple of tool definition dictionaries
     """
-    registry = get_tool_registry()
-    return registry.get_tool_definitions()
+    return _REGISTRY.get_tool_definitions()
 
 
 async def execute_tool(
@@ -315,16 +384,14 @@ async def execute_tool(
     Returns:
         Formatted tool result
     """
-    registry = get_tool_registry()
-    return await registry.execute_tool(tool_name, tool_input, session_context)
+    return await _REGISTRY.execute_tool(tool_name, tool_input, session_context)
 
 
-def list_available_tools() -> List[str]:
+def list_available_tools() -> Tuple[str, ...]:
     """
-    Get list of all available tool names.
+    Get all available tool names.
 
     Returns:
-        List of tool names
+        Tuple of tool names
     """
-    registry = get_tool_registry()
-    return registry.list_tools()
+    return _REGISTRY.list_tools()
@@ -8,9 +8,11 @@ Follows Anthropic's Tool Use guidelines for clear descriptions and parameter han
 """
 
 from typing import Optional, Dict, Any, List
-from datetime import datetime
 import asyncpg
-from src.database.connection import get_db_client
+from src.database.connection import DatabaseClient, get_db_client
+from src.utils.app_cache import invalidate_application
+from src.utils.ids import parse_uuid
+from src.tools.context import SessionContext
 
 
 # Tool definition for Anthropic Claude API
@@ -67,12 +69,135 @@ until reviewed and approved by a human.""",
 }
 
 
+# Static error responses built once at import and returned as-is (callers
+# must treat them as immutable). MappingProxyType would be safer but the
+# results cross the HTTP client's JSON encoder, which only handles plain
+# dicts. Errors whose message interpolates an ID still build per call.
+_ERR_APPLICATION_ID_REQUIRED = {
+    "error": "application_id_required",
+    "message": "No application_id provided and no application linked to current session. Please provide an application_id or link an application to this conversation."
+}
+
+_ERR_NO_TARGETS_SPECIFIED = {
+    "error": "no_targets_specified",
+    "message": "Must specify either document_id or field_ids (or both) to flag for audit."
+}
+
+
+# The entire flagging operation runs as one data-modifying CTE statement:
+# application authorization, document flag, field flags, timestamp bump,
+# and the audit trail entry commit atomically in a single round trip.
+# Each branch is gated server-side - the document and field updates only
+# fire when the application row matched, the field updates only fire when
+# no document was requested or the document matched, the timestamp bump
+# only fires when a document or field was actually flagged (an error path
+# such as document_not_found must not touch updated_at), and the trail
+# entries are skipped without a user_id. The audit trail gets one row per
+# flagged field (plus one for a flagged document) via set-based
+# INSERT ... SELECT from the update CTEs, keeping entries queryable per
+# field without any extra round trips. Hoisted to module scope so
+# asyncpg's per-connection statement cache reuses the prepared plan.
+_REQUEST_AUDIT_SQL = """
+    WITH app AS (
+        SELECT id
+        FROM applications
+        WHERE id = $1 AND ($2::text IS NULL OR analyst_id::text = $2)
+    ),
+    doc_upd AS (
+        UPDATE documents
+        SET
+            metadata = COALESCE(metadata, '{}'::jsonb) || jsonb_build_object(
+                'needs_audit', true,
+                'audit_reason', $3::text,
+                'audit_requested_at', NOW()::text
+            ),
+            extraction_status = CASE
+                WHEN extraction_status = 'processed' THEN 'audited'
+                ELSE extraction_status
+            END
+        WHERE $4::uuid IS NOT NULL
+            AND id = $4
+            AND application_id = $1
+            AND EXISTS (SELECT 1 FROM app)
+        RETURNING document_type
+    ),
+    field_upd AS (
+        UPDATE module_data
+        SET
+            audit_flagged = true,
+            audit_reason = $3,
+            audit_requested_at = NOW(),
+            updated_at = NOW()
+        WHERE application_id = $1
+            AND field_id = ANY($5::text[])
+            AND EXISTS (SELECT 1 FROM app)
+            AND ($4::uuid IS NULL OR EXISTS (SELECT 1 FROM doc_upd))
+        RETURNING field_id, module_number
+    ),
+    touch AS (
+        UPDATE applications
+        SET updated_at = NOW()
+        WHERE id = $1
+            AND (EXISTS (SELECT 1 FROM doc_upd) OR EXISTS (SELECT 1 FROM field_upd))
+    ),
+    trail_fields AS (
+        INSERT INTO audit_trail (
+            application_id,
+            user_id,
+            action,
+            field_id,
+            new_value,
+            created_at
+        )
+        SELECT $1, $2::uuid, 'audit_requested', f.field_id, $3, NOW()
+        FROM field_upd f
+        WHERE $2::uuid IS NOT NULL
+    ),
+    trail_doc AS (
+        INSERT INTO audit_trail (
+            application_id,
+            user_id,
+            action,
+            field_id,
+            new_value,
+            created_at
+        )
+        SELECT $1, $2::uuid, 'audit_requested', NULL, $3, NOW()
+        FROM doc_upd
+        WHERE $2::uuid IS NOT NULL
+    )
+    SELECT
+        (SELECT count(*) FROM app) AS app_found,
+        (SELECT document_type FROM doc_upd) AS flagged_document_type,
+        (SELECT json_agg(json_build_object(
+            'field_id', field_id,
+            'module_number', module_number
+        )) FROM field_upd) AS flagged_fields
+"""
+
+
+# Resolved database client, cached at module scope after the first call so
+# the hot path is a single load-and-check instead of re-entering the
+# connection module's lookup on every invocation.
+_db_client: Optional[DatabaseClient] = None
+
+
+async def _db() -> DatabaseClient:
+    """Return the shared database client, resolving it on first use."""
+    global _db_client
+    client = _db_client
+    if client is not None:
+        return client
+    _db_client = await get_db_client()
+    return _db_client
+
+
 async def request_audit(
     reason: str,
     application_id: Optional[str] = None,
     document_id: Optional[str] = None,
     field_ids: Optional[List[str]] = None,
-    session_context: Optional[Dict[str, Any]] = None
+    session_context: Optional[SessionContext] = None
 ) -> Dict[str, Any]:
     """
     Flag fields or documents that require manual audit review.
@@ -98,188 +223,52 @@ async def request_audit(
     # Determine which application to update
     target_application_id = application_id
     if not target_application_id and session_context:
-        target_application_id = session_context.get("application_id")
+        target_application_id = session_context.application_id
 
     if not target_application_id:
-        return {
-            "error": "application_id_required",
-            "message": "No application_id provided and no application linked to current session. Please provide an application_id or link an application to this conversation."
-        }
+        return _ERR_APPLICATION_ID_REQUIRED
 
     # Validate at least one target is specified
     if not document_id and not field_ids:
+        return _ERR_NO_TARGETS_SPECIFIED
+
+    # Parse IDs up front so malformed input is rejected without a
+    # round-trip, and asyncpg can bind the UUIDs in binary format
+    app_uuid = parse_uuid(target_application_id)
+    if app_uuid is None:
         return {
-            "error": "no_targets_specified",
-            "message": "Must specify either document_id or field_ids (or both) to flag for audit."
+            "error": "invalid_application_id",
+            "message": f"'{target_application_id}' is not a valid application UUID."
         }
 
-    try:
-        db_client = await get_db_client()
-
-        # Get user_id for authorization and audit trail
-        user_id = session_context.get("user_id") if session_context else None
-
-        # Verify application exists and user has access
-        app_query = """
-            SELECT id, user_id, status
-            FROM applications
-            WHERE id = $1
-        """
-        app_row = await db_client.pool.fetchrow(app_query, target_application_id)
-
-        if not app_row:
-            return {
-                "error": "application_not_found",
-                "message": f"Application {target_application_id} not found."
-            }
-
-        # Authorization check - user can only flag their own applications
-        if user_id and str(app_row["user_id"]) != user_id:
+    doc_uuid = None
+    if document_id:
+        doc_uuid = parse_uuid(document_id)
+        if doc_uuid is None:
             return {
-                "error": "unauthorized",
-                "message": "You do not have permission to flag items in this application."
+                "error": "invalid_document_id",
+                "message": f"'{document_id}' is not a valid document UUID."
             }
 
-        flagged_fields_count = 0
-        flagged_document = False
-        audit_details = []
-
-        # Flag document if specified
-        if document_id:
-            # Verify document belongs to this application
-            doc_check_query = """
-                SELECT id, document_type, extraction_status
-                FROM documents
-                WHERE id = $1 AND application_id = $2
-            """
-            doc_row = await db_client.pool.fetchrow(doc_check_query, document_id, target_application_id)
-
-            if not doc_row:
-                return {
-                    "error": "document_not_found",
-                    "message": f"Document {document_id} not found in application {target_application_id}."
-                }
+    # Get user_id for authorization and audit trail
+    user_id = session_context.user_id if session_context else None
 
-            # Update document metadata to include audit flag
-            update_doc_query = """
-                UPDATE documents
-                SET
-                    metadata = jsonb_set(
-                        COALESCE(metadata, '{}'::jsonb),
-                        '{needs_audit}',
-                        'true'::jsonb
-                    ),
-                    metadata = jsonb_set(
-                        metadata,
-                        '{audit_reason}',
-                        to_jsonb($1::text)
-                    ),
-                    metadata = jsonb_set(
-                        metadata,
-                        '{audit_requested_at}',
-                        to_jsonb($2::text)
-                    ),
-                    extraction_status = CASE
-                        WHEN extraction_status = 'processed' THEN 'audited'
-                        ELSE extraction_status
-                    END
-                WHERE id = $3
-                RETURNING id
-            """
-            await db_client.pool.fetchrow(
-                update_doc_query,
-                reason,
-                datetime.utcnow().isoformat(),
-                document_id
-            )
-
-            flagged_document = True
-            audit_details.append(f"Document {doc_row['document_type']} flagged")
-
-        # Flag fields if specified
-        if field_ids and len(field_ids) > 0:
-            for field_id in field_ids:
-                # Check if field exists in module_data
-                field_query = """
-                    SELECT id, module_number, field_id, value, source
-                    FROM module_data
-                    WHERE application_id = $1 AND field_id = $2
-                """
-                field_row = await db_client.pool.fetchrow(field_query, target_application_id, field_id)
-
-                if field_row:
-                    # Field exists - add audit flag to its value JSONB
-                    # We store the flag in a metadata structure within the JSONB value
-                    update_field_query = """
-                        UPDATE module_data
-                        SET
-                            value = CASE
-                                WHEN jsonb_typeof(value) = 'object' THEN
-                                    jsonb_set(
-                                        value,
-                                        '{_audit_flagged}',
-                                        'true'::jsonb
-                                    )
-                                ELSE
-                                    jsonb_build_object(
-                                        '_value', value,
-                                        '_audit_flagged', true,
-                                        '_audit_reason', $1,
-                                        '_audit_requested_at', $2
-                                    )
-                            END,
-                            updated_at = NOW()
-                        WHERE id = $3
-                        RETURNING id
-                    """
-                    await db_client.pool.fetchrow(
-                        update_field_query,
-                        reason,
-                        datetime.utcnow().isoformat(),
-                        field_row["id"]
-                    )
-
-                    flagged_fields_count += 1
-                    audit_details.append(f"Field '{field_id}' in module {field_row['module_number']} flagged")
-
-        # Create audit trail entry
-        if user_id:
-            audit_entry_query = """
-                INSERT INTO audit_trail (
-                    application_id,
-                    user_id,
-                    action,
-                    field_id,
-                    new_value,
-                    created_at
-                )
-                VALUES ($1, $2, $3, $4, $5, NOW())
-            """
-            field_list = ", ".join(field_ids) if field_ids else None
-            await db_client.pool.execute(
-                audit_entry_query,
-                target_application_id,
-                user_id,
-                "audit_requested",
-                field_list,
-                reason
-            )
-
-        # Update application's updated_at timestamp
-        await db_client.pool.execute(
-            "UPDATE applications SET updated_at = NOW() WHERE id = $1",
-            target_application_id
+    # The connection is only acquired now that validation has passed: a
+    # rejected call never touches the pool. The single fused statement
+    # goes through the pool directly rather than holding a connection
+    # for the whole call.
+    try:
+        db_client = await _db()
+
+        row = await db_client.pool.fetchrow(
+            _REQUEST_AUDIT_SQL,
+            app_uuid,
+            user_id,
+            reason,
+            doc_uuid,
+            field_ids
         )
 
-        return {
-            "success": True,
-            "flagged_fields_count": flagged_fields_count,
-            "flagged_document": flagged_document,
-            "reason": reason,
-            "details": audit_details,
-            "message": f"Successfully flagged {flagged_fields_count} field(s) and {1 if flagged_document else 0} document(s) for manual audit review. Reason: {reason}"
-        }
-
     except asyncpg.PostgresError as e:
         return {
             "error": "database_error",
@@ -291,6 +280,42 @@ async def request_audit(
             "message": f"Unexpected error: {str(e)}"
         }
 
+    if not row["app_found"]:
+        return {
+            "error": "application_not_found",
+            "message": f"Application {target_application_id} not found or you do not have permission to flag items in it."
+        }
+
+    if document_id and row["flagged_document_type"] is None:
+        return {
+            "error": "document_not_found",
+            "message": f"Document {document_id} not found in application {target_application_id}."
+        }
+
+    flagged_document = document_id is not None
+    flagged_fields = row["flagged_fields"] or []
+    flagged_fields_count = len(flagged_fields)
+
+    audit_details = []
+    if flagged_document:
+        audit_details.append(f"Document {row['flagged_document_type']} flagged")
+    audit_details.extend(
+        f"Field '{field['field_id']}' in module {field['module_number']} flagged"
+        for field in flagged_fields
+    )
+
+    # Drop any cached query_application results for this application
+    invalidate_application(target_application_id)
+
+    return {
+        "success": True,
+        "flagged_fields_count": flagged_fields_count,
+        "flagged_document": flagged_document,
+        "reason": reason,
+        "details": audit_details,
+        "message": f"Successfully flagged {flagged_fields_count} field(s) and {1 if flagged_document else 0} document(s) for manual audit review. Reason: {reason}"
+    }
+
 
 def get_tool_definition() -> Dict[str, Any]:
     """
@@ -300,3 +325,4 @@ def get_tool_definition() -> Dict[str, Any]:
         Tool definition dictionary for use in Claude API calls
     """
     return TOOL_DEFINITION
+
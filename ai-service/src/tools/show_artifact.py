@@ -10,10 +10,14 @@ providing a richer user experience for complex data visualization.
 Follows Anthropic's Tool Use guidelines for clear descriptions and parameter handling.
 """
 
-from typing import Optional, Dict, Any
-from datetime import datetime
+import asyncio
+import functools
+from typing import Optional, Dict, Any, Callable, Awaitable
+from datetime import datetime, timezone
 import asyncpg
-from src.database.connection import get_db_client
+from src.database.connection import DatabaseClient, get_db_client
+from src.utils.ids import parse_uuid
+from src.tools.context import SessionContext
 
 
 # Tool definition for Anthropic Claude API
@@ -67,11 +71,341 @@ and interact with their actual documents and forms.""",
 }
 
 
+# Module display names and panel titles, precomputed at import instead of
+# rebuilding the dict and formatting the title on every module_form call
+MODULE_NAMES = {
+    1: "Financial Information",
+    2: "Compliance Records",
+    3: "Operations Data",
+    4: "Sustainability Practices",
+    5: "Risk Management"
+}
+_MODULE_TITLES = {
+    number: f"Module {number}: {name}"
+    for number, name in MODULE_NAMES.items()
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _pretty_doc_type(document_type: str) -> str:
+    """Format a snake_case document_type for display titles."""
+    return document_type.replace("_", " ").title()
+
+
+# Queries hoisted to module scope so every call passes identical SQL
+# text: asyncpg's per-connection statement cache is keyed on the query
+# string, so server-side prepared plans are reused across invocations.
+# Both document branches share _DOC_WITH_OWNER_SQL, and module_form and
+# audit_review share _APP_AUTH_SQL. Ownership is enforced in the WHERE
+# clause ($2 is the session user_id, NULL to skip the check), so an
+# unauthorized row simply does not come back and "not found" and
+# "unauthorized" collapse into one response.
+_DOC_WITH_OWNER_SQL = """
+    SELECT
+        d.id,
+        d.application_id,
+        d.document_type,
+        d.storage_path,
+        d.extraction_status,
+        d.metadata
+    FROM documents d
+    JOIN applications a ON a.id = d.application_id
+    WHERE d.id = $1 AND ($2::text IS NULL OR a.analyst_id::text = $2)
+"""
+
+_FIELDS_BY_DOCUMENT_SQL = """
+    SELECT module_number, field_id, value, confidence_score
+    FROM module_data
+    WHERE source_document_id = $1
+    ORDER BY module_number, field_id
+"""
+
+_APP_AUTH_SQL = """
+    SELECT id, status
+    FROM applications
+    WHERE id = $1 AND ($2::text IS NULL OR analyst_id::text = $2)
+"""
+
+_APP_SUMMARY_SQL = """
+    SELECT id, status, farmer_name, created_at, updated_at
+    FROM applications
+    WHERE id = $1 AND ($2::text IS NULL OR analyst_id::text = $2)
+"""
+
+_FLAGGED_COUNT_SQL = """
+    SELECT COUNT(*)
+    FROM module_data
+    WHERE application_id = $1 AND audit_flagged
+"""
+
+
+# Resolved database client, cached at module scope after the first call so
+# the hot path is a single load-and-check instead of re-entering the
+# connection module's lookup on every invocation.
+_db_client: Optional[DatabaseClient] = None
+
+
+async def _db() -> DatabaseClient:
+    """Return the shared database client, resolving it on first use."""
+    global _db_client
+    client = _db_client
+    if client is not None:
+        return client
+    _db_client = await get_db_client()
+    return _db_client
+
+
+async def _load_document(db_client, document_id, user_id: Optional[str]):
+    """
+    Load a document row the given user is allowed to see.
+
+    Shared by the 'document' and 'extraction_preview' branches so both
+    run the same prepared statement.
+
+    Args:
+        db_client: Connected DatabaseClient
+        document_id: UUID of the document
+        user_id: Session user_id for the ownership check, or None to skip it
+
+    Returns:
+        asyncpg Record or None if the document does not exist or is not
+        owned by the user
+    """
+    return await db_client.pool.fetchrow(_DOC_WITH_OWNER_SQL, document_id, user_id)
+
+
+# Per-artifact-type handlers. Each validates access and returns either the
+# panel metadata dict or an error dict (distinguished by the 'error' key).
+# Dispatch goes through the _HANDLERS table below instead of an if/elif
+# chain, which also makes the table the single source of valid types.
+
+async def _handle_document(
+    db_client: DatabaseClient,
+    artifact_id: str,
+    target_application_id: Optional[str],
+    user_id: Optional[str]
+) -> Dict[str, Any]:
+    """Build metadata for the 'document' artifact panel."""
+    # Parse up front so malformed IDs are rejected without a round-trip
+    # and asyncpg binds the UUID in binary format
+    doc_uuid = parse_uuid(artifact_id)
+    if doc_uuid is None:
+        return {
+            "error": "invalid_document_id",
+            "message": f"'{artifact_id}' is not a valid document UUID."
+        }
+
+    doc_row = await _load_document(db_client, doc_uuid, user_id)
+
+    if not doc_row:
+        return {
+            "error": "document_not_found",
+            "message": f"Document {artifact_id} not found or you do not have permission to view it."
+        }
+
+    return {
+        "document_id": doc_row["id"],
+        "application_id": doc_row["application_id"],
+        "document_type": doc_row["document_type"],
+        "extraction_status": doc_row["extraction_status"],
+        "storage_path": doc_row["storage_path"],
+        "title": f"{_pretty_doc_type(doc_row['document_type'])} Document"
+    }
+
+
+async def _handle_extraction_preview(
+    db_client: DatabaseClient,
+    artifact_id: str,
+    target_application_id: Optional[str],
+    user_id: Optional[str]
+) -> Dict[str, Any]:
+    """Build metadata for the 'extraction_preview' artifact panel."""
+    doc_uuid = parse_uuid(artifact_id)
+    if doc_uuid is None:
+        return {
+            "error": "invalid_document_id",
+            "message": f"'{artifact_id}' is not a valid document UUID."
+        }
+
+    # Similar to document but includes extracted fields. Both queries are
+    # independent, so they run concurrently on two pooled connections and
+    # cost one round trip of wall clock
+    doc_row, fields = await asyncio.gather(
+        _load_document(db_client, doc_uuid, user_id),
+        db_client.pool.fetch(_FIELDS_BY_DOCUMENT_SQL, doc_uuid)
+    )
+
+    if not doc_row:
+        return {
+            "error": "document_not_found",
+            "message": f"Document {artifact_id} not found or you do not have permission to view it."
+        }
+
+    return {
+        "document_id": doc_row["id"],
+        "application_id": doc_row["application_id"],
+        "document_type": doc_row["document_type"],
+        "storage_path": doc_row["storage_path"],
+        "extracted_fields_count": len(fields),
+        "title": f"Extraction Preview: {_pretty_doc_type(doc_row['document_type'])}"
+    }
+
+
+async def _handle_module_form(
+    db_client: DatabaseClient,
+    artifact_id: str,
+    target_application_id: Optional[str],
+    user_id: Optional[str]
+) -> Dict[str, Any]:
+    """Build metadata for the 'module_form' artifact panel."""
+    # Validate module number
+    try:
+        module_number = int(artifact_id)
+        if module_number < 1 or module_number > 5:
+            raise ValueError()
+    except ValueError:
+        return {
+            "error": "invalid_module_number",
+            "message": f"artifact_id for 'module_form' must be a module number 1-5. Got: {artifact_id}"
+        }
+
+    app_uuid = parse_uuid(target_application_id)
+    if app_uuid is None:
+        return {
+            "error": "invalid_application_id",
+            "message": f"'{target_application_id}' is not a valid application UUID."
+        }
+
+    # Validate application exists and user has access
+    app_row = await db_client.pool.fetchrow(_APP_AUTH_SQL, app_uuid, user_id)
+
+    if not app_row:
+        return {
+            "error": "application_not_found",
+            "message": f"Application {target_application_id} not found or you do not have permission to view it."
+        }
+
+    return {
+        "module_number": module_number,
+        "module_name": MODULE_NAMES[module_number],
+        "application_id": app_row["id"],
+        "application_status": app_row["status"],
+        "title": _MODULE_TITLES[module_number]
+    }
+
+
+async def _handle_application_summary(
+    db_client: DatabaseClient,
+    artifact_id: str,
+    target_application_id: Optional[str],
+    user_id: Optional[str]
+) -> Dict[str, Any]:
+    """Build metadata for the 'application_summary' artifact panel."""
+    # Use artifact_id as application_id
+    app_id = artifact_id if artifact_id != "current" else target_application_id
+
+    if not app_id:
+        return _ERR_SUMMARY_APP_ID
+
+    app_uuid = parse_uuid(app_id)
+    if app_uuid is None:
+        return {
+            "error": "invalid_application_id",
+            "message": f"'{app_id}' is not a valid application UUID."
+        }
+
+    app_row = await db_client.pool.fetchrow(_APP_SUMMARY_SQL, app_uuid, user_id)
+
+    if not app_row:
+        return {
+            "error": "application_not_found",
+            "message": f"Application {app_id} not found or you do not have permission to view it."
+        }
+
+    return {
+        "application_id": app_row["id"],
+        "status": app_row["status"],
+        "farmer_name": app_row["farmer_name"],
+        "created_at": app_row["created_at"].isoformat(),
+        "title": f"Certification Application: {app_row['farmer_name']}"
+    }
+
+
+async def _handle_audit_review(
+    db_client: DatabaseClient,
+    artifact_id: str,
+    target_application_id: Optional[str],
+    user_id: Optional[str]
+) -> Dict[str, Any]:
+    """Build metadata for the 'audit_review' artifact panel."""
+    # Show fields flagged for audit
+    app_id = artifact_id if artifact_id != "current" else target_application_id
+
+    if not app_id:
+        return _ERR_AUDIT_REVIEW_APP_ID
+
+    app_uuid = parse_uuid(app_id)
+    if app_uuid is None:
+        return {
+            "error": "invalid_application_id",
+            "message": f"'{app_id}' is not a valid application UUID."
+        }
+
+    app_row = await db_client.pool.fetchrow(_APP_AUTH_SQL, app_uuid, user_id)
+
+    if not app_row:
+        return {
+            "error": "application_not_found",
+            "message": f"Application {app_id} not found or you do not have permission to view it."
+        }
+
+    # Count flagged fields; fetchval skips the Record wrapper for a
+    # single-column probe
+    flagged_count = await db_client.pool.fetchval(_FLAGGED_COUNT_SQL, app_uuid) or 0
+
+    return {
+        "application_id": app_row["id"],
+        "flagged_fields_count": flagged_count,
+        "title": f"Audit Review: {flagged_count} Field(s) Flagged"
+    }
+
+
+_HANDLERS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+    "document": _handle_document,
+    "module_form": _handle_module_form,
+    "extraction_preview": _handle_extraction_preview,
+    "application_summary": _handle_application_summary,
+    "audit_review": _handle_audit_review,
+}
+
+# Joined once at import; the rejection message only varies in the
+# offending type, so the valid-type list is not re-joined per call
+_VALID_TYPES_MSG = "Must be one of: " + ", ".join(_HANDLERS)
+
+# Static error responses built once at import and returned as-is (callers
+# must treat them as immutable); errors whose message interpolates an ID
+# still build per call
+_ERR_MODULE_FORM_APP_ID = {
+    "error": "application_id_required",
+    "message": "artifact_type 'module_form' requires application_id (provide explicitly or via session context)"
+}
+
+_ERR_SUMMARY_APP_ID = {
+    "error": "application_id_required",
+    "message": "No application_id provided for 'application_summary'"
+}
+
+_ERR_AUDIT_REVIEW_APP_ID = {
+    "error": "application_id_required",
+    "message": "No application_id provided for 'audit_review'"
+}
+
+
 async def show_artifact(
     artifact_type: str,
     artifact_id: str,
     application_id: Optional[str] = None,
-    session_context: Optional[Dict[str, Any]] = None
+    session_context: Optional[SessionContext] = None
 ) -> Dict[str, Any]:
     """
     Trigger UI artifact panel to display specific content.
@@ -94,250 +428,32 @@ async def show_artifact(
         - error: Error code
         - message: Error description
     """
-    # Validate artifact_type
-    valid_types = ["document", "module_form", "extraction_preview", "application_summary", "audit_review"]
-    if artifact_type not in valid_types:
+    # Validate artifact_type via the dispatch table
+    handler = _HANDLERS.get(artifact_type)
+    if handler is None:
         return {
             "error": "invalid_artifact_type",
-            "message": f"Invalid artifact_type '{artifact_type}'. Must be one of: {', '.join(valid_types)}"
+            "message": f"Invalid artifact_type '{artifact_type}'. {_VALID_TYPES_MSG}"
         }
 
     # Determine application_id
     target_application_id = application_id
     if not target_application_id and session_context:
-        target_application_id = session_context.get("application_id")
+        target_application_id = session_context.application_id
 
     # For module_form, application_id is required
     if artifact_type == "module_form" and not target_application_id:
-        return {
-            "error": "application_id_required",
-            "message": "artifact_type 'module_form' requires application_id (provide explicitly or via session context)"
-        }
+        return _ERR_MODULE_FORM_APP_ID
 
     try:
-        db_client = await get_db_client()
-        user_id = session_context.get("user_id") if session_context else None
+        db_client = await _db()
+        user_id = session_context.user_id if session_context else None
 
         # Validate access and get artifact metadata based on type
-        metadata = {}
-
-        if artifact_type == "document":
-            # Validate document exists and user has access
-            doc_query = """
-                SELECT
-                    d.id,
-                    d.application_id,
-                    d.document_type,
-                    d.storage_path,
-                    d.extraction_status,
-                    d.metadata,
-                    a.user_id
-                FROM documents d
-                JOIN applications a ON a.id = d.application_id
-                WHERE d.id = $1
-            """
-            doc_row = await db_client.pool.fetchrow(doc_query, artifact_id)
-
-            if not doc_row:
-                return {
-                    "error": "document_not_found",
-                    "message": f"Document {artifact_id} not found."
-                }
-
-            if user_id and str(doc_row["user_id"]) != user_id:
-                return {
-                    "error": "unauthorized",
-                    "message": "You do not have permission to view this document."
-                }
-
-            metadata = {
-                "document_id": str(doc_row["id"]),
-                "application_id": str(doc_row["application_id"]),
-                "document_type": doc_row["document_type"],
-                "extraction_status": doc_row["extraction_status"],
-                "storage_path": doc_row["storage_path"],
-                "title": f"{doc_row['document_type'].replace('_', ' ').title()} Document"
-            }
-
-        elif artifact_type == "extraction_preview":
-            # Similar to document but includes extracted fields
-            doc_query = """
-                SELECT
-                    d.id,
-                    d.application_id,
-                    d.document_type,
-                    d.storage_path,
-                    d.extraction_status,
-                    d.metadata,
-                    a.user_id
-                FROM documents d
-                JOIN applications a ON a.id = d.application_id
-                WHERE d.id = $1
-            """
-            doc_row = await db_client.pool.fetchrow(doc_query, artifact_id)
-
-            if not doc_row:
-                return {
-                    "error": "document_not_found",
-                    "message": f"Document {artifact_id} not found."
-                }
-
-            if user_id and str(doc_row["user_id"]) != user_id:
-                return {
-                    "error": "unauthorized",
-                    "message": "You do not have permission to view this document."
-                }
-
-            # Get extracted fields linked to this document
-            fields_query = """
-                SELECT module_number, field_id, value, confidence_score
-                FROM module_data
-                WHERE source_document_id = $1
-                ORDER BY module_number, field_id
-            """
-            fields = await db_client.pool.fetch(fields_query, artifact_id)
-
-            metadata = {
-                "document_id": str(doc_row["id"]),
-                "application_id": str(doc_row["application_id"]),
-                "document_type": doc_row["document_type"],
-                "storage_path": doc_row["storage_path"],
-                "extracted_fields_count": len(fields),
-                "title": f"Extraction Preview: {doc_row['document_type'].replace('_', ' ').title()}"
-            }
+        metadata = await handler(db_client, artifact_id, target_application_id, user_id)
 
-        elif artifact_type == "module_form":
-            # Validate module number
-            try:
-                module_number = int(artifact_id)
-                if module_number < 1 or module_number > 5:
-                    raise ValueError()
-            except ValueError:
-                return {
-                    "error": "invalid_module_number",
-                    "message": f"artifact_id for 'module_form' must be a module number 1-5. Got: {artifact_id}"
-                }
-
-            # Validate application exists and user has access
-            app_query = """
-                SELECT id, user_id, status
-                FROM applications
-                WHERE id = $1
-            """
-            app_row = await db_client.pool.fetchrow(app_query, target_application_id)
-
-            if not app_row:
-                return {
-                    "error": "application_not_found",
-                    "message": f"Application {target_application_id} not found."
-                }
-
-            if user_id and str(app_row["user_id"]) != user_id:
-                return {
-                    "error": "unauthorized",
-                    "message": "You do not have permission to view this application."
-                }
-
-            module_names = {
-                1: "Financial Information",
-                2: "Compliance Records",
-                3: "Operations Data",
-                4: "Sustainability Practices",
-                5: "Risk Management"
-            }
-
-            metadata = {
-                "module_number": module_number,
-                "module_name": module_names[module_number],
-                "application_id": str(app_row["id"]),
-                "application_status": app_row["status"],
-                "title": f"Module {module_number}: {module_names[module_number]}"
-            }
-
-        elif artifact_type == "application_summary":
-            # Use artifact_id as application_id
-            app_id = artifact_id if artifact_id != "current" else target_application_id
-
-            if not app_id:
-                return {
-                    "error": "application_id_required",
-                    "message": "No application_id provided for 'application_summary'"
-                }
-
-            app_query = """
-                SELECT id, user_id, status, certification_type, created_at, updated_at
-                FROM applications
-                WHERE id = $1
-            """
-            app_row = await db_client.pool.fetchrow(app_query, app_id)
-
-            if not app_row:
-                return {
-                    "error": "application_not_found",
-                    "message": f"Application {app_id} not found."
-                }
-
-            if user_id and str(app_row["user_id"]) != user_id:
-                return {
-                    "error": "unauthorized",
-                    "message": "You do not have permission to view this application."
-                }
-
-            metadata = {
-                "application_id": str(app_row["id"]),
-                "status": app_row["status"],
-                "certification_type": app_row["certification_type"],
-                "created_at": app_row["created_at"].isoformat(),
-                "title": f"{app_row['certification_type'].title()} Certification Application"
-            }
-
-        elif artifact_type == "audit_review":
-            # Show fields flagged for audit
-            app_id = artifact_id if artifact_id != "current" else target_application_id
-
-            if not app_id:
-                return {
-                    "error": "application_id_required",
-                    "message": "No application_id provided for 'audit_review'"
-                }
-
-            app_query = """
-                SELECT id, user_id, status
-                FROM applications
-                WHERE id = $1
-            """
-            app_row = await db_client.pool.fetchrow(app_query, app_id)
-
-            if not app_row:
-                return {
-                    "error": "application_not_found",
-                    "message": f"Application {app_id} not found."
-                }
-
-            if user_id and str(app_row["user_id"]) != user_id:
-                return {
-                    "error": "unauthorized",
-                    "message": "You do not have permission to view this application."
-                }
-
-            # Count flagged fields
-            flagged_query = """
-                SELECT COUNT(*) as count
-                FROM module_data
-                WHERE application_id = $1
-                    AND (
-                        (jsonb_typeof(value) = 'object' AND value->>'_audit_flagged' = 'true')
-                        OR value @> '{"_audit_flagged": true}'::jsonb
-                    )
-            """
-            flagged_row = await db_client.pool.fetchrow(flagged_query, app_id)
-            flagged_count = flagged_row["count"] if flagged_row else 0
-
-            metadata = {
-                "application_id": str(app_row["id"]),
-                "flagged_fields_count": flagged_count,
-                "title": f"Audit Review: {flagged_count} Field(s) Flagged"
-            }
+        if "error" in metadata:
+            return metadata
 
         # Return success with UI trigger metadata
         return {
@@ -347,7 +463,7 @@ async def show_artifact(
             "ui_action": "open_artifact_panel",
             "metadata": metadata,
             "message": f"Opening {artifact_type.replace('_', ' ')} panel for user.",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat()
         }
 
     except asyncpg.PostgresError as e:
@@ -370,3 +486,4 @@ def get_tool_definition() -> Dict[str, Any]:
         Tool definition dictionary for use in Claude API calls
     """
     return TOOL_DEFINITION
+
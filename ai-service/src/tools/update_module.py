@@ -10,7 +10,9 @@ Follows Anthropic's Tool Use guidelines for clear descriptions and parameter han
 from typing import Optional, Dict, Any
 from datetime import datetime
 import asyncpg
-from src.database.connection import get_db_client
+from src.database.connection import DatabaseClient, get_db_client
+from src.utils.app_cache import invalidate_application
+from src.tools.context import SessionContext
 
 
 # Tool definition for Anthropic Claude API
@@ -79,12 +81,104 @@ MODULE_NAMES = {
 }
 
 
+# The whole write path runs as one data-modifying CTE statement: the
+# application lookup, existing-field check, UPDATE-or-INSERT, and the
+# application timestamp bump commit atomically in a single round trip.
+# When the stored value already equals the new one, both writes (and the
+# timestamp bump they gate) are skipped server-side, so an idempotent
+# re-submit costs no WAL traffic at all.
+# Authorization and the locked-status check gate the writes server-side
+# (they cannot stay in Python once the writes share the statement), but
+# the app CTE itself is unfiltered so Python can still tell "not found",
+# "unauthorized", and "locked" apart from the returned columns. Hoisted
+# to module scope so asyncpg's per-connection statement cache reuses
+# the prepared plan.
+_UPDATE_MODULE_SQL = """
+    WITH app AS (
+        SELECT id, analyst_id, status
+        FROM applications
+        WHERE id = $1
+    ),
+    writable AS (
+        SELECT 1
+        FROM app
+        WHERE status NOT IN ('certified', 'locked')
+            AND ($5::text IS NULL OR analyst_id::text = $5)
+    ),
+    existing AS (
+        SELECT id, value, source
+        FROM module_data
+        WHERE application_id = $1
+            AND module_number = $2
+            AND field_id = $3
+    ),
+    upd AS (
+        UPDATE module_data m
+        SET
+            value = $4,
+            source = 'proxy_edited',
+            confidence_score = 1.0,
+            updated_at = NOW()
+        FROM existing e
+        WHERE m.id = e.id
+            AND e.value IS DISTINCT FROM $4
+            AND EXISTS (SELECT 1 FROM writable)
+        RETURNING m.id
+    ),
+    ins AS (
+        INSERT INTO module_data (
+            application_id,
+            module_number,
+            field_id,
+            value,
+            source,
+            confidence_score,
+            created_at,
+            updated_at
+        )
+        SELECT $1, $2, $3, $4, 'proxy_entered', 1.0, NOW(), NOW()
+        WHERE NOT EXISTS (SELECT 1 FROM existing)
+            AND EXISTS (SELECT 1 FROM writable)
+        RETURNING id
+    ),
+    touch AS (
+        UPDATE applications
+        SET updated_at = NOW()
+        WHERE id = $1
+            AND (EXISTS (SELECT 1 FROM upd) OR EXISTS (SELECT 1 FROM ins))
+    )
+    SELECT
+        (SELECT count(*) FROM app) AS app_found,
+        (SELECT analyst_id FROM app) AS app_analyst_id,
+        (SELECT status FROM app) AS app_status,
+        (SELECT count(*) FROM existing) AS field_existed,
+        (SELECT value FROM existing) AS old_value,
+        (SELECT source FROM existing) AS old_source
+"""
+
+
+# Resolved database client, cached at module scope after the first call so
+# the hot path is a single load-and-check instead of re-entering the
+# connection module's lookup on every invocation.
+_db_client: Optional[DatabaseClient] = None
+
+
+async def _db() -> DatabaseClient:
+    """Return the shared database client, resolving it on first use."""
+    global _db_client
+    client = _db_client
+    if client is not None:
+        return client
+    _db_client = await get_db_client()
+    return _db_client
+
+
 async def update_module(
     module_number: int,
     field_id: str,
     value: str,
     application_id: Optional[str] = None,
-    session_context: Optional[Dict[str, Any]] = None
+    session_context: Optional[SessionContext] = None
 ) -> Dict[str, Any]:
     """
     Update a specific field value in a data module.
@@ -122,7 +216,7 @@ async def update_module(
     # Determine which application to update
     target_application_id = application_id
     if not target_application_id and session_context:
-        target_application_id = session_context.get("application_id")
+        target_application_id = session_context.application_id
 
     if not target_application_id:
         return {
@@ -130,121 +224,21 @@ async def update_module(
             "message": "No application_id provided and no application linked to current session. Please provide an application_id or link an application to this conversation."
         }
 
-    try:
-        db_client = await get_db_client()
-
-        # Get user_id for authorization check
-        user_id = session_context.get("user_id") if session_context else None
-
-        # Verify application exists and user has access
-        app_query = """
-            SELECT id, user_id, status
-            FROM applications
-            WHERE id = $1
-        """
-        app_row = await db_client.pool.fetchrow(app_query, target_application_id)
-
-        if not app_row:
-            return {
-                "error": "application_not_found",
-                "message": f"Application {target_application_id} not found."
-            }
-
-        # Authorization check - user can only update their own applications
-        if user_id and str(app_row["user_id"]) != user_id:
-            return {
-                "error": "unauthorized",
-                "message": "You do not have permission to update this application."
-            }
+    # Get user_id for authorization check
+    user_id = session_context.user_id if session_context else None
 
-        # Check if application is locked (status: approved or rejected)
-        if app_row["status"] in ["approved", "rejected"]:
-            return {
-                "error": "application_locked",
-                "message": f"Cannot update fields in a {app_row['status']} application. Application is locked."
-            }
+    try:
+        db_client = await _db()
 
-        # Check if field already exists for this module
-        existing_query = """
-            SELECT id, field_value
-            FROM module_data
-            WHERE application_id = $1
-                AND module_name = $2
-                AND field_name = $3
-        """
-        existing_row = await db_client.pool.fetchrow(
-            existing_query,
+        row = await db_client.pool.fetchrow(
+            _UPDATE_MODULE_SQL,
             target_application_id,
-            module_name,
-            field_id
-        )
-
-        old_value = None
-        data_source = "proxy_entered"  # Default for new fields
-
-        if existing_row:
-            # Field exists - update it
-            old_value = existing_row["field_value"]
-            data_source = "proxy_edited"
-
-            update_query = """
-                UPDATE module_data
-                SET
-                    field_value = $1,
-                    data_source = $2,
-                    confidence_score = 1.0,
-                    updated_at = NOW()
-                WHERE id = $3
-                RETURNING id
-            """
-            await db_client.pool.fetchrow(
-                update_query,
-                value,
-                data_source,
-                existing_row["id"]
-            )
-        else:
-            # Field doesn't exist - create it
-            insert_query = """
-                INSERT INTO module_data (
-                    application_id,
-                    module_name,
-                    field_name,
-                    field_value,
-                    data_source,
-                    confidence_score,
-                    created_at,
-                    updated_at
-                )
-                VALUES ($1, $2, $3, $4, $5, 1.0, NOW(), NOW())
-                RETURNING id
-            """
-            await db_client.pool.fetchrow(
-                insert_query,
-                target_application_id,
-                module_name,
-                field_id,
-                value,
-                data_source
-            )
-
-        # Update application's updated_at timestamp
-        await db_client.pool.execute(
-            "UPDATE applications SET updated_at = NOW() WHERE id = $1",
-            target_application_id
+            module_number,
+            field_id,
+            value,
+            user_id
         )
 
-        return {
-            "success": True,
-            "field_id": field_id,
-            "module_name": module_name,
-            "module_number": module_number,
-            "old_value": old_value,
-            "new_value": value,
-            "data_source": data_source,
-            "message": f"Successfully {'updated' if old_value else 'created'} field '{field_id}' in {module_name} module (Module {module_number})."
-        }
-
     except asyncpg.PostgresError as e:
         return {
             "error": "database_error",
@@ -256,6 +250,60 @@ async def update_module(
             "message": f"Unexpected error: {str(e)}"
         }
 
+    if not row["app_found"]:
+        return {
+            "error": "application_not_found",
+            "message": f"Application {target_application_id} not found."
+        }
+
+    # Authorization check - analysts can only update their own applications
+    if user_id and row["app_analyst_id"] != user_id:
+        return {
+            "error": "unauthorized",
+            "message": "You do not have permission to update this application."
+        }
+
+    # Check if application is locked (status: certified or locked)
+    if row["app_status"] in ["certified", "locked"]:
+        return {
+            "error": "application_locked",
+            "message": f"Cannot update fields in a {row['app_status']} application. Application is locked."
+        }
+
+    field_existed = bool(row["field_existed"])
+    old_value = row["old_value"] if field_existed else None
+
+    # Idempotent re-submit: the statement skips both writes when the
+    # stored value already matches, so nothing changed and the cached
+    # query_application results stay valid
+    if field_existed and old_value == value:
+        return {
+            "success": True,
+            "field_id": field_id,
+            "module_name": module_name,
+            "module_number": module_number,
+            "old_value": old_value,
+            "new_value": value,
+            "data_source": row["old_source"],
+            "message": f"No change - field '{field_id}' in {module_name} module (Module {module_number}) already has this value."
+        }
+
+    data_source = "proxy_edited" if field_existed else "proxy_entered"
+
+    # Drop any cached query_application results for this application
+    invalidate_application(target_application_id)
+
+    return {
+        "success": True,
+        "field_id": field_id,
+        "module_name": module_name,
+        "module_number": module_number,
+        "old_value": old_value,
+        "new_value": value,
+        "data_source": data_source,
+        "message": f"Successfully {'updated' if field_existed else 'created'} field '{field_id}' in {module_name} module (Module {module_number})."
+    }
+
 
 def get_tool_definition() -> Dict[str, Any]:
     """
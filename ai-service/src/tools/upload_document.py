@@ -10,11 +10,15 @@ Follows Anthropic's Tool Use guidelines for clear descriptions and parameter han
 
 from typing import Optional, Dict, Any
 from datetime import datetime
-from src.database.connection import get_db_client
+from src.database.connection import DatabaseClient, get_db_client
+from src.utils.app_cache import invalidate_application
+from src.tools.context import SessionContext
 
 
-# Valid document types for certification applications
-DOCUMENT_TYPES = [
+# Valid document types for certification applications. The ordered tuple
+# feeds the tool-definition enum; the frozenset gives O(1) membership
+# checks and the joined form is reused wherever the list is spelled out.
+DOCUMENT_TYPES = (
     "financial_statement",
     "tax_return",
     "bank_statement",
@@ -24,7 +28,28 @@ DOCUMENT_TYPES = [
     "environmental_permit",
     "compliance_certificate",
     "other"
-]
+)
+_DOCUMENT_TYPES_SET = frozenset(DOCUMENT_TYPES)
+_DOCUMENT_TYPES_CSV = ", ".join(DOCUMENT_TYPES)
+
+# Per-type guidance and display names, built once at import instead of
+# reconstructing the dicts on every call
+_DEFAULT_INSTRUCTIONS = {
+    "financial_statement": "Please upload your most recent annual or quarterly financial statement. Include all pages showing assets, liabilities, income, and expenses.",
+    "tax_return": "Please upload your complete federal tax return from the most recent year. Include all schedules and supporting documents.",
+    "bank_statement": "Please upload bank statements from the last 3-6 months. Include all pages showing transactions and account balances.",
+    "land_deed": "Please upload property deeds or ownership documents for all land included in this application.",
+    "insurance_certificate": "Please upload current insurance certificates showing adequate coverage for your operations.",
+    "business_license": "Please upload your current business registration, license, or incorporation documents.",
+    "environmental_permit": "Please upload any required environmental permits, compliance certificates, or inspection reports.",
+    "compliance_certificate": "Please upload relevant compliance certificates, audit reports, or certification documents.",
+    "other": "Please upload the requested document. Ensure all pages are clear and readable."
+}
+
+_DISPLAY_TYPES = {
+    doc_type: doc_type.replace("_", " ").title()
+    for doc_type in DOCUMENT_TYPES
+}
 
 
 # Tool definition for Anthropic Claude API
@@ -66,8 +91,8 @@ available for the AI to help populate application fields.""",
         "properties": {
             "document_type": {
                 "type": "string",
-                "description": f"Type of document being requested. Must be one of: {', '.join(DOCUMENT_TYPES)}. Choose the most specific type that matches the document.",
-                "enum": DOCUMENT_TYPES
+                "description": f"Type of document being requested. Must be one of: {_DOCUMENT_TYPES_CSV}. Choose the most specific type that matches the document.",
+                "enum": list(DOCUMENT_TYPES)
             },
             "application_id": {
                 "type": "string",
@@ -83,11 +108,39 @@ available for the AI to help populate application fields.""",
 }
 
 
+# Hoisted to module scope so asyncpg's per-connection statement cache
+# reuses the prepared plan. Ownership is enforced in the WHERE clause
+# ($2 is the session user_id, NULL to skip the check), so an
+# unauthorized row simply does not come back and "not found" and
+# "unauthorized" collapse into one response.
+_APP_AUTH_SQL = """
+    SELECT id, status
+    FROM applications
+    WHERE id = $1 AND ($2::text IS NULL OR analyst_id::text = $2)
+"""
+
+
+# Resolved database client, cached at module scope after the first call so
+# the hot path is a single load-and-check instead of re-entering the
+# connection module's lookup on every invocation.
+_db_client: Optional[DatabaseClient] = None
+
+
+async def _db() -> DatabaseClient:
+    """Return the shared database client, resolving it on first use."""
+    global _db_client
+    client = _db_client
+    if client is not None:
+        return client
+    _db_client = await get_db_client()
+    return _db_client
+
+
 async def upload_document(
     document_type: str,
     application_id: Optional[str] = None,
     instructions: Optional[str] = None,
-    session_context: Optional[Dict[str, Any]] = None
+    session_context: Optional[SessionContext] = None
 ) -> Dict[str, Any]:
     """
     Request a document upload from the user.
@@ -114,16 +167,16 @@ async def upload_document(
         - message: Error description
     """
     # Validate document type
-    if document_type not in DOCUMENT_TYPES:
+    if document_type not in _DOCUMENT_TYPES_SET:
         return {
             "error": "invalid_document_type",
-            "message": f"Document type must be one of: {', '.join(DOCUMENT_TYPES)}. Got: {document_type}"
+            "message": f"Document type must be one of: {_DOCUMENT_TYPES_CSV}. Got: {document_type}"
         }
 
     # Determine application_id
     target_application_id = application_id
     if not target_application_id and session_context:
-        target_application_id = session_context.get("application_id")
+        target_application_id = session_context.application_id
 
     if not target_application_id:
         return {
@@ -132,49 +185,29 @@ async def upload_document(
         }
 
     # Get user_id for authorization
-    user_id = session_context.get("user_id") if session_context else None
+    user_id = session_context.user_id if session_context else None
 
     try:
-        db_client = await get_db_client()
+        db_client = await _db()
 
         # Verify application exists and user has access
-        app_query = """
-            SELECT id, user_id, status, certification_type
-            FROM applications
-            WHERE id = $1
-        """
-        application = await db_client.pool.fetchrow(app_query, target_application_id)
+        application = await db_client.pool.fetchrow(_APP_AUTH_SQL, target_application_id, user_id)
 
         if not application:
             return {
                 "error": "application_not_found",
-                "message": f"Application {target_application_id} not found."
-            }
-
-        # Authorization check
-        if user_id and str(application["user_id"]) != user_id:
-            return {
-                "error": "unauthorized",
-                "message": "You do not have permission to upload documents to this application."
+                "message": f"Application {target_application_id} not found or you do not have permission to upload documents to it."
             }
 
         # Generate document-type-specific instructions
-        default_instructions = {
-            "financial_statement": "Please upload your most recent annual or quarterly financial statement. Include all pages showing assets, liabilities, income, and expenses.",
-            "tax_return": "Please upload your complete federal tax return from the most recent year. Include all schedules and supporting documents.",
-            "bank_statement": "Please upload bank statements from the last 3-6 months. Include all pages showing transactions and account balances.",
-            "land_deed": "Please upload property deeds or ownership documents for all land included in this application.",
-            "insurance_certificate": "Please upload current insurance certificates showing adequate coverage for your operations.",
-            "business_license": "Please upload your current business registration, license, or incorporation documents.",
-            "environmental_permit": "Please upload any required environmental permits, compliance certificates, or inspection reports.",
-            "compliance_certificate": "Please upload relevant compliance certificates, audit reports, or certification documents.",
-            "other": "Please upload the requested document. Ensure all pages are clear and readable."
-        }
+        upload_instructions = instructions or _DEFAULT_INSTRUCTIONS.get(document_type, "Please upload the requested document.")
 
-        upload_instructions = instructions or default_instructions.get(document_type, "Please upload the requested document.")
+        # The requested upload will add a document to this application, so
+        # drop any cached query_application results now.
+        invalidate_application(str(application["id"]))
 
         # Format document type for display
-        display_type = document_type.replace("_", " ").title()
+        display_type = _DISPLAY_TYPES[document_type]
 
         return {
             "upload_requested": True,
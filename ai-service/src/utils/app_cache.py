@@ -0,0 +1,96 @@
+"""
+In-process cache for query_application results.
+
+The AI service runs as a single uvicorn process, so a module-level TTL
+cache fills the role a shared Redis layer would in a multi-instance
+deployment: repeated "what's my application status?" tool calls are served
+from memory instead of re-running the aggregate query against Postgres.
+
+Entries are keyed by (application_id, variant), where the variant is any
+hashable value distinguishing request shapes (requesting user, pagination
+limits) so authorization stays correct and differently shaped results
+never mix. Entries expire after CACHE_TTL_SECONDS and are invalidated
+explicitly by the tools that mutate application state.
+"""
+
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .ids import parse_uuid
+
+# How long a cached result stays valid without explicit invalidation
+CACHE_TTL_SECONDS = 60.0
+
+# (application_id, variant) -> (expires_at_monotonic, cached_result)
+_cache: Dict[Tuple[str, Hashable], Tuple[float, Dict[str, Any]]] = {}
+
+
+def get_cached_application(
+    application_id: str,
+    variant: Hashable
+) -> Optional[Dict[str, Any]]:
+    """
+    Get a cached query_application result if present and not expired.
+
+    Args:
+        application_id: UUID of the application
+        variant: Hashable value distinguishing request shapes
+            (e.g. requesting user_id and pagination limit)
+
+    Returns:
+        Cached result dictionary or None on miss/expiry
+    """
+    key = (application_id, variant)
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+
+    expires_at, result = entry
+    if time.monotonic() >= expires_at:
+        del _cache[key]
+        return None
+
+    return result
+
+
+def cache_application(
+    application_id: str,
+    variant: Hashable,
+    result: Dict[str, Any]
+):
+    """
+    Cache a successful query_application result.
+
+    Args:
+        application_id: UUID of the application
+        variant: Hashable value distinguishing request shapes
+            (e.g. requesting user_id and pagination limit)
+        result: Result dictionary to cache
+    """
+    _cache[(application_id, variant)] = (
+        time.monotonic() + CACHE_TTL_SECONDS,
+        result
+    )
+
+
+def invalidate_application(application_id: str):
+    """
+    Drop all cached entries for an application after a mutation.
+
+    Called by tools that write application, document, or module data so
+    the next query_application call sees fresh state.
+
+    Args:
+        application_id: UUID of the mutated application
+    """
+    # Cache keys are canonicalized by query_application via str(UUID(...)),
+    # but callers invalidate with the id as they received it - a case
+    # variant that writes through fine would otherwise miss the cached
+    # entry. Normalize here so every caller matches.
+    app_uuid = parse_uuid(application_id)
+    if app_uuid is not None:
+        application_id = str(app_uuid)
+
+    stale_keys = [key for key in _cache if key[0] == application_id]
+    for key in stale_keys:
+        del _cache[key]
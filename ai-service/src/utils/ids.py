@@ -0,0 +1,27 @@
+"""
+UUID parsing helper shared by the agent tools.
+
+Identifier parameters arrive from Claude as plain strings. Parsing them
+in Python before any database work rejects malformed IDs without a
+round-trip, and handing asyncpg a UUID object lets it bind the value in
+binary format (16 bytes) instead of 36-byte text.
+"""
+
+from typing import Optional
+from uuid import UUID
+
+
+def parse_uuid(value: Optional[str]) -> Optional[UUID]:
+    """
+    Parse a string into a UUID, returning None when it is not one.
+
+    Args:
+        value: Candidate UUID string (or None)
+
+    Returns:
+        Parsed UUID, or None if the value is missing or malformed
+    """
+    try:
+        return UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
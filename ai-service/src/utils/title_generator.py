@@ -4,13 +4,20 @@ Session title generator using Claude.
 Generates concise, meaningful titles from conversation context.
 """
 
+import asyncio
 import logging
-from typing import Optional
+import re
+import textwrap
+from collections import OrderedDict
+from typing import Dict, Optional
 
 from ..claude.client import get_client as get_claude_client
 
 logger = logging.getLogger(__name__)
 
+# Compiled once; collapses runs of whitespace in a single C-level pass
+_WS_RE = re.compile(r"\s+")
+
 TITLE_PROMPT = """Generate a brief, descriptive title (5-8 words max) for this conversation based on the first exchange.
 The title should:
 - Capture the main topic or intent
@@ -33,6 +40,52 @@ ASSISTANT RESPONSE:
 
 Generate only the title, nothing else:"""
 
+# Template split once at import around its two placeholders, so each call
+# joins constant pieces with the inputs instead of re-scanning the whole
+# template with str.format
+_PROMPT_PREFIX, _rest = TITLE_PROMPT.split("{user_message}")
+_PROMPT_MID, _PROMPT_SUFFIX = _rest.split("{assistant_response}")
+del _rest
+
+# Generated titles memoized by first-exchange content: the output is
+# fully determined by the inputs, so retries and duplicate sessions with
+# the same opening exchange reuse the prior title instead of paying
+# another model round trip. Oldest entries are evicted beyond the cap.
+_TITLE_CACHE_MAX = 256
+_title_cache: "OrderedDict[str, str]" = OrderedDict()
+
+# In-flight generations keyed like the cache: concurrent calls with the
+# same first exchange await the leader's future instead of each issuing
+# their own model request. Dict operations happen between awaits on the
+# event loop, so no lock is needed.
+_pending: Dict[str, "asyncio.Future[str]"] = {}
+
+
+def _truncate(title: str, max_length: int) -> str:
+    """
+    Shorten a title to max_length at a word boundary.
+
+    textwrap.shorten does the collapse-and-truncate in one pass, instead
+    of a slice plus an rfind plus a second slice.
+
+    Args:
+        title: Title to shorten
+        max_length: Maximum length including the ellipsis
+
+    Returns:
+        The title, word-boundary truncated with a trailing ellipsis if
+        it exceeded max_length
+    """
+    if len(title) <= max_length:
+        return title
+    shortened = textwrap.shorten(title, width=max_length, placeholder="...")
+    # shorten returns just the placeholder when the first word alone
+    # exceeds the width (e.g. a long URL); hard-slice in that case so
+    # the title is never a bare ellipsis
+    if shortened == "...":
+        return title[:max_length - 3] + "..."
+    return shortened
+
 
 async def generate_session_title(
     user_message: str,
@@ -53,13 +106,33 @@ async def generate_session_title(
     Raises:
         Exception: If Claude API call fails
     """
+    # The cache stores the cleaned, untruncated title so hits work for
+    # any max_length; truncation below is cheap
+    cache_key = user_message[:500] + "\x1e" + assistant_response[:500]
+    title = _title_cache.get(cache_key)
+    if title is not None:
+        _title_cache.move_to_end(cache_key)
+        return _truncate(title, max_length)
+
+    # Coalesce with an identical generation already in flight
+    pending = _pending.get(cache_key)
+    if pending is not None:
+        title = await pending
+        return _truncate(title, max_length) or "New Conversation"
+
+    future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+    _pending[cache_key] = future
+
     try:
         claude = get_claude_client()
 
-        prompt = TITLE_PROMPT.format(
-            user_message=user_message[:500],  # Limit input size
-            assistant_response=assistant_response[:500]
-        )
+        prompt = "".join((
+            _PROMPT_PREFIX,
+            user_message[:500],  # Limit input size
+            _PROMPT_MID,
+            assistant_response[:500],
+            _PROMPT_SUFFIX
+        ))
 
         response = await claude.send_message(
             message=prompt,
@@ -67,24 +140,43 @@ async def generate_session_title(
             max_tokens=50
         )
 
-        # Extract text from response
-        title = ""
-        for block in response.get("content", []):
-            if block.get("type") == "text":
-                title += block.get("text", "")
+        # Extract text from response in one pass
+        title = "".join(
+            block.get("text", "")
+            for block in response.get("content", ())
+            if block.get("type") == "text"
+        )
 
         # Clean up the title
         title = title.strip().strip('"\'')
 
+        if title:
+            _title_cache[cache_key] = title
+            if len(_title_cache) > _TITLE_CACHE_MAX:
+                _title_cache.popitem(last=False)
+
+        future.set_result(title)
+
         # Enforce max length
-        if len(title) > max_length:
-            title = title[:max_length-3] + "..."
+        title = _truncate(title, max_length)
 
         return title or "New Conversation"
 
     except Exception as e:
         logger.error(f"Title generation failed: {str(e)}")
+        future.set_exception(e)
+        # Mark the exception retrieved so a waiterless failure doesn't
+        # log a "never retrieved" warning at collection
+        future.exception()
         raise
+    finally:
+        # If the leader was cancelled (e.g. the client disconnected),
+        # CancelledError bypasses the except clause above and the future
+        # would be popped unresolved - cancel it so coalesced waiters
+        # are released to their fallback path instead of hanging forever
+        if not future.done():
+            future.cancel()
+        _pending.pop(cache_key, None)
 
 
 def create_fallback_title(user_message: str, max_length: int = 50) -> str:
@@ -98,17 +190,6 @@ def create_fallback_title(user_message: str, max_length: int = 50) -> str:
     Returns:
         Truncated message as title
     """
-    # Clean up whitespace
-    clean_message = " ".join(user_message.split())
-
-    if len(clean_message) <= max_length:
-        return clean_message
-
-    # Truncate at word boundary
-    truncated = clean_message[:max_length-3]
-    last_space = truncated.rfind(" ")
-
-    if last_space > max_length // 2:
-        truncated = truncated[:last_space]
-
-    return truncated + "..."
+    # Clean up whitespace, then truncate at a word boundary
+    clean_message = _WS_RE.sub(" ", user_message).strip()
+    return _truncate(clean_message, max_length)
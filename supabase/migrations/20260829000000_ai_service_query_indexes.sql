@@ -0,0 +1,14 @@
+-- Composite indexes for AI-service application queries
+-- The query_application tool aggregates an application's documents
+-- (newest first) and its module data grouped per module in one statement.
+-- The existing single-column indexes on application_id force a separate
+-- sort step for each aggregate; these composite indexes let both
+-- aggregates stream rows in their output order.
+
+-- Documents listed per application, newest first
+CREATE INDEX IF NOT EXISTS idx_documents_application_id_created_at
+  ON public.documents(application_id, created_at DESC);
+
+-- Module data grouped per application by module then field
+CREATE INDEX IF NOT EXISTS idx_module_data_application_module_field
+  ON public.module_data(application_id, module_number, field_id);
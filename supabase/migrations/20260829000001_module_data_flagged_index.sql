@@ -0,0 +1,11 @@
+-- Partial index for audit-flagged module fields
+-- The audit_review artifact and certification checks count flagged fields
+-- per application. Flagged rows are a small fraction of module_data, so a
+-- partial index keyed on application_id turns the count into an
+-- index-only scan instead of evaluating JSONB predicates per row.
+-- request_audit always writes the flag into an object value, so the
+-- object-shaped predicate is the only one the service needs.
+
+CREATE INDEX IF NOT EXISTS idx_module_data_flagged
+  ON public.module_data(application_id)
+  WHERE jsonb_typeof(value) = 'object' AND value->>'_audit_flagged' = 'true';
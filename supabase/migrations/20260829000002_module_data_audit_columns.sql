@@ -0,0 +1,29 @@
+-- Dedicated audit-flag columns on module_data
+-- Flagging a field previously rewrote its entire value JSONB to embed
+-- _audit_flagged/_audit_reason/_audit_requested_at keys; PostgreSQL
+-- rewrites (and potentially re-toasts) the whole JSONB on every such
+-- update. Scalar columns make the flag a cheap HOT-updatable write and
+-- let the flagged count run as an index-only scan.
+
+ALTER TABLE public.module_data
+  ADD COLUMN IF NOT EXISTS audit_flagged BOOLEAN NOT NULL DEFAULT false,
+  ADD COLUMN IF NOT EXISTS audit_reason TEXT,
+  ADD COLUMN IF NOT EXISTS audit_requested_at TIMESTAMPTZ;
+
+-- Backfill flags recorded in the JSONB value by earlier versions of the
+-- request_audit tool. Values are left untouched; new flags no longer
+-- write into them.
+UPDATE public.module_data
+SET
+  audit_flagged = true,
+  audit_reason = value->>'_audit_reason',
+  audit_requested_at = (value->>'_audit_requested_at')::timestamptz
+WHERE jsonb_typeof(value) = 'object'
+  AND value->>'_audit_flagged' = 'true';
+
+-- Replace the JSONB-predicate partial index with one on the new column
+DROP INDEX IF EXISTS idx_module_data_flagged;
+
+CREATE INDEX IF NOT EXISTS idx_module_data_audit_flagged
+  ON public.module_data(application_id)
+  WHERE audit_flagged;
@@ -0,0 +1,13 @@
+-- Drop the unused GIN index on module_data.value
+-- The value column is only ever read and written as a whole document:
+-- the AI service and the Express backend filter on application_id /
+-- module_number / field_id and inspect values in application code, and
+-- no query uses containment or existence operators on value. The GIN
+-- index therefore only adds maintenance cost to every module_data
+-- insert and update (and blocks HOT updates when value changes).
+--
+-- The column stays JSONB: consumers receive decoded documents either
+-- way, and JSONB keeps the option of indexed containment open if a
+-- query ever needs it.
+
+DROP INDEX IF EXISTS idx_module_data_value;